@@ -0,0 +1,72 @@
+"""Synthetic device tracker state changes."""
+
+import asyncio
+from math import cos, radians
+
+from homeassistant.components.device_tracker.const import SourceType
+from homeassistant.const import STATE_NOT_HOME
+from homeassistant.core import HomeAssistant
+
+from custom_components.dawarich.helpers import EARTH_RADIUS_M
+
+START_LATITUDE = 59.3293
+START_LONGITUDE = 18.0686
+
+
+class DeviceTrackerDriver:
+    """Move ``count`` device trackers, each updating ``rate`` times a second.
+
+    Every device travels east at ``speed`` metres per second from its own
+    starting point, so each state change carries a new position.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, count: int, rate: float, *, speed: float = 10
+    ) -> None:
+        """Initialize the driver."""
+        self._hass = hass
+        self._rate = rate
+        self._speed = speed
+        self.entity_ids = [f"device_tracker.bench_{index}" for index in range(count)]
+        self.state_changes = 0
+
+    def _set_state(self, index: int, entity_id: str, tick: int) -> None:
+        """Write the state of a device after tick updates."""
+        latitude = START_LATITUDE + index * 0.01
+        metres = tick * self._speed / self._rate
+        longitude = START_LONGITUDE + metres / (
+            EARTH_RADIUS_M * cos(radians(latitude)) * radians(1)
+        )
+        self._hass.states.async_set(
+            entity_id,
+            STATE_NOT_HOME,
+            {
+                "source_type": SourceType.GPS,
+                "latitude": latitude,
+                "longitude": longitude,
+                "gps_accuracy": 5,
+                "altitude": 20,
+                "speed": self._speed,
+                "battery": 80,
+            },
+        )
+        self.state_changes += 1
+
+    async def _async_drive(self, index: int, entity_id: str, duration: float) -> None:
+        """Update one device on schedule until duration has passed."""
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        tick = 0
+        while (deadline := start + tick / self._rate) < start + duration:
+            await asyncio.sleep(deadline - loop.time())
+            self._set_state(index, entity_id, tick)
+            tick += 1
+
+    async def async_run(self, duration: float) -> None:
+        """Update all devices for duration seconds."""
+        await asyncio.gather(
+            *(
+                self._async_drive(index, entity_id, duration)
+                for index, entity_id in enumerate(self.entity_ids)
+            )
+        )
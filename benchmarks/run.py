@@ -0,0 +1,272 @@
+"""Measure point upload throughput and latency against a stub Dawarich server.
+
+Run from the repository root, for example::
+
+    python -m benchmarks.run --devices 20 --rate 2 --duration 60 --latency 0.05
+
+The integration is set up in a bare Home Assistant core against a local stub
+server, synthetic device tracker state changes are fired for the requested
+duration, and the entry is unloaded so the outbox is flushed before results
+are reported.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import resource
+import statistics
+import tempfile
+import time
+import tracemalloc
+from typing import Any
+
+from homeassistant import auth, config_entries, loader
+from homeassistant.const import (
+    CONF_API_KEY,
+    CONF_HOST,
+    CONF_NAME,
+    CONF_PORT,
+    CONF_SSL,
+    CONF_VERIFY_SSL,
+)
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+from homeassistant.helpers import area_registry as ar
+from homeassistant.helpers import category_registry as cr
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers import floor_registry as fr
+from homeassistant.helpers import issue_registry as ir
+from homeassistant.helpers import label_registry as lr
+from homeassistant.setup import async_setup_component
+
+from custom_components.dawarich.const import (
+    CONF_DEVICE,
+    CONF_MAX_CONNECTIONS,
+    CONF_MIN_DISTANCE,
+    CONF_MIN_INTERVAL,
+    CONF_SIMPLIFY_TOLERANCE,
+    DOMAIN,
+)
+
+from .driver import DeviceTrackerDriver
+from .server import DawarichStubServer
+
+API_KEY = "benchmark"
+LOOP_LAG_INTERVAL = 0.05
+
+
+class LoopLagMonitor:
+    """Sample how late the event loop wakes up a sleeping task."""
+
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL) -> None:
+        """Initialize the monitor."""
+        self._interval = interval
+        self.lags: list[float] = []
+
+    async def async_run(self) -> None:
+        """Sample until cancelled."""
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self._interval)
+            self.lags.append(loop.time() - start - self._interval)
+
+
+async def async_start_hass(config_dir: str) -> HomeAssistant:
+    """Start a bare Home Assistant core that can load the integration."""
+    hass = HomeAssistant(config_dir)
+    hass.config.skip_pip = True
+    loader.async_setup(hass)
+    for registry in (ar, fr, lr, cr, dr, er, ir):
+        await registry.async_load(hass)
+    hass.config_entries = config_entries.ConfigEntries(hass, {})
+    await hass.config_entries.async_initialize()
+    await async_setup_component(hass, "homeassistant", {})
+    await hass.async_start()
+    # The shared client session resolves hosts through zeroconf. The network
+    # component and the webhook of the integration need the HTTP component,
+    # which is set up after the start so that it never listens on a port.
+    hass.auth = await auth.auth_manager_from_config(hass, [], [])
+    await async_setup_component(hass, "network", {})
+    return hass
+
+
+async def async_add_entry(
+    hass: HomeAssistant,
+    server: DawarichStubServer,
+    entity_ids: list[str],
+    options: dict[str, Any],
+) -> config_entries.ConfigEntry:
+    """Add a config entry for the stub server through the config and options flows."""
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"],
+        {
+            CONF_HOST: server.host,
+            CONF_PORT: server.port,
+            CONF_NAME: "Benchmark",
+            CONF_DEVICE: entity_ids,
+            CONF_SSL: False,
+            CONF_VERIFY_SSL: False,
+        },
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {CONF_API_KEY: API_KEY}
+    )
+    if result["type"] is not FlowResultType.CREATE_ENTRY:
+        raise RuntimeError(f"Could not add the config entry: {result}")
+    entry = result["result"]
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {**entry.options, **options}
+    )
+    await hass.async_block_till_done()
+    return entry
+
+
+def percentiles(values: list[float]) -> dict[str, float | None]:
+    """Return the p50, p95 and p99 of values."""
+    if len(values) < 2:
+        return {"p50": None, "p95": None, "p99": None}
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {"p50": cuts[49], "p95": cuts[94], "p99": cuts[98]}
+
+
+async def async_run(args: argparse.Namespace) -> dict[str, Any]:
+    """Run the benchmark and return its results."""
+    server = DawarichStubServer(
+        API_KEY,
+        latency=args.latency,
+        jitter=args.jitter,
+        failure_rate=args.failure_rate,
+        seed=args.seed,
+    )
+    await server.async_start()
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = await async_start_hass(config_dir)
+        driver = DeviceTrackerDriver(hass, args.devices, args.rate, speed=args.speed)
+        entry = await async_add_entry(
+            hass,
+            server,
+            driver.entity_ids,
+            {
+                CONF_MIN_DISTANCE: args.min_distance,
+                CONF_MIN_INTERVAL: args.min_interval,
+                CONF_SIMPLIFY_TOLERANCE: args.simplify_tolerance,
+                CONF_MAX_CONNECTIONS: args.max_connections,
+            },
+        )
+
+        monitor = LoopLagMonitor()
+        monitor_task = asyncio.create_task(monitor.async_run())
+        if args.tracemalloc:
+            tracemalloc.start()
+        start = time.perf_counter()
+        await driver.async_run(args.duration)
+        # Unloading flushes whatever is still waiting in the outboxes
+        await hass.config_entries.async_unload(entry.entry_id)
+        elapsed = time.perf_counter() - start
+        traced_peak = None
+        if args.tracemalloc:
+            traced_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        monitor_task.cancel()
+
+        await hass.async_stop()
+    await server.async_stop()
+
+    return {
+        "elapsed_s": elapsed,
+        "state_changes": driver.state_changes,
+        "points_uploaded": server.stats.points,
+        "requests": server.stats.requests,
+        "failed_requests": server.stats.failed_requests,
+        "throughput_points_per_s": server.stats.points / elapsed,
+        "upload_latency_s": percentiles(server.stats.point_latencies),
+        "loop_lag_s": {
+            **percentiles(monitor.lags),
+            "max": max(monitor.lags, default=None),
+        },
+        # ru_maxrss is reported in KiB on Linux
+        "peak_rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "traced_peak_mib": None if traced_peak is None else traced_peak / 2**20,
+    }
+
+
+def format_results(results: dict[str, Any]) -> str:
+    """Format the results as aligned lines."""
+
+    def _format(value: Any) -> str:
+        if value is None:
+            return "-"
+        if isinstance(value, float):
+            return f"{value:.4f}"
+        return str(value)
+
+    lines = []
+    for key, value in results.items():
+        if isinstance(value, dict):
+            value = "  ".join(f"{k}={_format(v)}" for k, v in value.items())
+        lines.append(f"{key:<24} {_format(value)}")
+    return "\n".join(lines)
+
+
+def get_arguments() -> argparse.Namespace:
+    """Get the command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=5, help="tracked devices")
+    parser.add_argument(
+        "--rate", type=float, default=1, help="state changes per device per second"
+    )
+    parser.add_argument(
+        "--duration", type=float, default=30, help="seconds to fire state changes"
+    )
+    parser.add_argument(
+        "--speed", type=float, default=10, help="device speed in metres per second"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0, help="stub server latency in seconds"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0, help="extra random stub server latency"
+    )
+    parser.add_argument(
+        "--failure-rate",
+        type=float,
+        default=0,
+        help="share of stub server requests answered with a 503",
+    )
+    parser.add_argument("--min-distance", type=float, default=0)
+    parser.add_argument("--min-interval", type=float, default=0)
+    parser.add_argument("--simplify-tolerance", type=float, default=0)
+    parser.add_argument("--max-connections", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument(
+        "--tracemalloc",
+        action="store_true",
+        help="trace Python allocations while running, slows the benchmark down",
+    )
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--debug", action="store_true", help="log debug output")
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    args = get_arguments()
+    # Some dependencies configure logging on import, replace their handler
+    logging.basicConfig(
+        level=logging.DEBUG if args.debug else logging.WARNING, force=True
+    )
+    results = asyncio.run(async_run(args))
+    print(json.dumps(results, indent=2) if args.json else format_results(results))  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Local stand-in for the Dawarich endpoints used by the integration."""
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from aiohttp import web
+from dawarich_api.constants import DawarichV1Endpoint
+
+STUB_VERSION = "0.30.1"
+
+
+@dataclass(slots=True)
+class DawarichStubStats:
+    """What the stub server has seen so far."""
+
+    requests: int = 0
+    failed_requests: int = 0
+    points: int = 0
+    # Seconds between a point's timestamp and the stub receiving it
+    point_latencies: list[float] = field(default_factory=list)
+
+
+class DawarichStubServer:
+    """Serve the Dawarich stats, health, areas and points endpoints.
+
+    Every request is delayed by ``latency`` plus up to ``jitter`` seconds,
+    and answered with a 503 with probability ``failure_rate``. The health
+    endpoint is never failed, so the integration can always be set up.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        *,
+        latency: float = 0,
+        jitter: float = 0,
+        failure_rate: float = 0,
+        seed: int | None = None,
+    ) -> None:
+        """Initialize the server."""
+        self.api_key = api_key
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.stats = DawarichStubStats()
+        self._random = random.Random(seed)
+        self._runner: web.AppRunner | None = None
+        self._port: int | None = None
+
+        self._app = web.Application()
+        self._app.router.add_get(DawarichV1Endpoint.API_V1_HEALTH, self._handle_health)
+        self._app.router.add_get(
+            DawarichV1Endpoint.API_V1_STATS_PATH, self._handle_stats
+        )
+        self._app.router.add_post(DawarichV1Endpoint.API_V1_POINTS, self._handle_points)
+        self._app.router.add_get(DawarichV1Endpoint.API_V1_AREAS, self._handle_areas)
+
+    @property
+    def host(self) -> str:
+        """Return the host the server listens on."""
+        return "127.0.0.1"
+
+    @property
+    def port(self) -> int:
+        """Return the port the server listens on."""
+        assert self._port is not None
+        return self._port
+
+    async def async_start(self) -> None:
+        """Start listening on a free port."""
+        self._runner = web.AppRunner(self._app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, 0)
+        await site.start()
+        self._port = self._runner.addresses[0][1]
+
+    async def async_stop(self) -> None:
+        """Stop the server."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _async_delay(self) -> bool:
+        """Wait for the configured latency, return False to fail the request."""
+        self.stats.requests += 1
+        delay = self.latency + self._random.uniform(0, self.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+        if self._random.random() < self.failure_rate:
+            self.stats.failed_requests += 1
+            return False
+        return True
+
+    def _authorized(self, request: web.Request) -> bool:
+        """Check the bearer token of a request."""
+        return request.headers.get("Authorization") == f"Bearer {self.api_key}"
+
+    async def _handle_health(self, request: web.Request) -> web.Response:
+        """Report the server as healthy."""
+        await asyncio.sleep(self.latency)
+        return web.json_response(
+            {"status": "ok"}, headers={"X-Dawarich-Version": STUB_VERSION}
+        )
+
+    async def _handle_stats(self, request: web.Request) -> web.Response:
+        """Return stats counting the points received so far."""
+        if not self._authorized(request):
+            raise web.HTTPUnauthorized
+        if not await self._async_delay():
+            raise web.HTTPServiceUnavailable
+        return web.json_response(
+            {
+                "totalDistanceKm": 0,
+                "totalPointsTracked": self.stats.points,
+                "totalReverseGeocodedPoints": 0,
+                "totalCountriesVisited": 0,
+                "totalCitiesVisited": 0,
+                "yearlyStats": [],
+            }
+        )
+
+    async def _handle_areas(self, request: web.Request) -> web.Response:
+        """Return a user without areas."""
+        if not self._authorized(request):
+            raise web.HTTPUnauthorized
+        if not await self._async_delay():
+            raise web.HTTPServiceUnavailable
+        return web.json_response([])
+
+    async def _handle_points(self, request: web.Request) -> web.Response:
+        """Accept a batch of points."""
+        if not self._authorized(request):
+            raise web.HTTPUnauthorized
+        locations = (await request.json())["locations"]
+        if not await self._async_delay():
+            raise web.HTTPServiceUnavailable
+        received = time.time()
+        for location in locations:
+            timestamp = datetime.fromisoformat(location["properties"]["timestamp"])
+            self.stats.point_latencies.append(received - timestamp.timestamp())
+        self.stats.points += len(locations)
+        return web.json_response({}, status=201)
@@ -1,9 +1,11 @@
 """The Dawarich integration."""
 
+import asyncio
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from datetime import timedelta
+from functools import partial
 
-from dawarich_api import DawarichAPI
 from homeassistant import config_entries
 from homeassistant.const import (
     CONF_API_KEY,
@@ -12,19 +14,62 @@ from homeassistant.const import (
     CONF_PORT,
     CONF_SSL,
     CONF_VERIFY_SSL,
+    CONF_WEBHOOK_ID,
     MAJOR_VERSION,
     Platform,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.typing import ConfigType
 
-from .const import CONF_DEVICE, DOMAIN
-from .coordinator import DawarichStatsCoordinator, DawarichVersionCoordinator
-from .helpers import get_api
+from .api import DawarichClient
+from .cache import DawarichStatsCache
+from .const import (
+    CONF_COALESCE_WINDOW,
+    CONF_DEVICE,
+    CONF_MAX_BATCH_SIZE,
+    CONF_MAX_CONNECTIONS,
+    CONF_RESTORE_CACHE,
+    CONF_STATS_MAX_INTERVAL,
+    CONF_STATS_MIN_INTERVAL,
+    CONF_TIMEOUT,
+    CONF_WEBHOOK,
+    DEFAULT_COALESCE_WINDOW,
+    DEFAULT_MAX_CONNECTIONS,
+    DEFAULT_RESTORE_CACHE,
+    DEFAULT_TIMEOUT,
+    DEFAULT_WEBHOOK,
+    DOMAIN,
+    SIGNAL_WEBHOOK_UPLOADER,
+    STATS_MAX_UPDATE_INTERVAL,
+    UPDATE_INTERVAL,
+    UPLOAD_MAX_BATCH_SIZE,
+    WEBHOOK_OUTBOX,
+)
+from .coordinator import (
+    DawarichAreasCoordinator,
+    DawarichStatsCoordinator,
+    DawarichVersionCoordinator,
+)
+from .helpers import get_api, get_tracker_name
+from .importer import DawarichHistoryImporter, async_remove_checkpoints
+from .outbox import DawarichOutbox, async_list_outboxes
+from .recent import DawarichRecentPoints
+from .registry import get_coordinator_registry
+from .services import async_setup_services
+from .thinning import DawarichPointThinner
+from .uploader import DawarichPointUploader
+from .webhook import DawarichWebhook, async_register_webhook
 
 VERSION = "0.7.0"
 
 PLATFORMS: list[Platform] = [Platform.SENSOR]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
 _LOGGER = logging.getLogger(__name__)
 
 type DawarichConfigEntry = config_entries.ConfigEntry[DawarichConfigEntryData]
@@ -34,9 +79,25 @@ type DawarichConfigEntry = config_entries.ConfigEntry[DawarichConfigEntryData]
 class DawarichConfigEntryData:
     """Runtime data definitions."""
 
-    api: DawarichAPI
+    api: DawarichClient
     coordinator: DawarichStatsCoordinator
     version_coordinator: DawarichVersionCoordinator
+    uploaders: dict[str, DawarichPointUploader]
+    importer: DawarichHistoryImporter
+    recent_points: dict[str, DawarichRecentPoints]
+    webhook_uploaders: dict[str, DawarichPointUploader] = field(default_factory=dict)
+    areas_coordinator: DawarichAreasCoordinator | None = None
+
+    @property
+    def all_uploaders(self) -> list[DawarichPointUploader]:
+        """Return the uploaders of the tracked devices and the webhook."""
+        return [*self.uploaders.values(), *self.webhook_uploaders.values()]
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Dawarich services."""
+    async_setup_services(hass)
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: DawarichConfigEntry) -> bool:
@@ -49,7 +110,17 @@ async def async_setup_entry(hass: HomeAssistant, entry: DawarichConfigEntry) ->
     use_ssl = entry.data[CONF_SSL]
     verify_ssl = entry.data[CONF_VERIFY_SSL]
 
-    api = get_api(host, api_key, use_ssl, verify_ssl)
+    api = get_api(
+        hass,
+        host,
+        api_key,
+        use_ssl,
+        verify_ssl,
+        max_connections=int(
+            entry.options.get(CONF_MAX_CONNECTIONS, DEFAULT_MAX_CONNECTIONS)
+        ),
+        timeout=entry.options.get(CONF_TIMEOUT, DEFAULT_TIMEOUT),
+    )
 
     if MAJOR_VERSION < 2025:
         _LOGGER.warning(
@@ -57,35 +128,266 @@ async def async_setup_entry(hass: HomeAssistant, entry: DawarichConfigEntry) ->
             " dawarich-home-assistantyou will need at least Home Assistant Core version 2025.1"
         )
 
-    coordinator = DawarichStatsCoordinator(hass, api)
-    await coordinator.async_config_entry_first_refresh()
-    version_coordinator = DawarichVersionCoordinator(hass, api)
-    await version_coordinator.async_config_entry_first_refresh()
+    # Entries for the same server and user share their coordinators
+    registry = get_coordinator_registry(hass)
+    entry.async_on_unload(partial(registry.async_release, entry.entry_id))
+    shared_stats = registry.async_acquire_stats(
+        entry.entry_id,
+        api,
+        lambda: DawarichStatsCoordinator(
+            hass,
+            api,
+            min_interval=timedelta(
+                seconds=entry.options.get(
+                    CONF_STATS_MIN_INTERVAL, UPDATE_INTERVAL.total_seconds()
+                )
+            ),
+            max_interval=timedelta(
+                seconds=entry.options.get(
+                    CONF_STATS_MAX_INTERVAL, STATS_MAX_UPDATE_INTERVAL.total_seconds()
+                )
+            ),
+        ),
+    )
+    shared_version = registry.async_acquire_version(
+        entry.entry_id, api, lambda: DawarichVersionCoordinator(hass, api)
+    )
+    coordinator = shared_stats.coordinator
+    version_coordinator = shared_version.coordinator
+
+    cache = DawarichStatsCache(hass, entry.entry_id)
+    restore_cache = entry.options.get(CONF_RESTORE_CACHE, DEFAULT_RESTORE_CACHE)
+    async with shared_stats.lock, shared_version.lock:
+        if restore_cache:
+            # Start with the last known data and refresh it in the background
+            for refresh_coordinator in await cache.async_restore(
+                coordinator, version_coordinator
+            ):
+                entry.async_create_background_task(
+                    hass,
+                    refresh_coordinator.async_refresh(),
+                    f"{refresh_coordinator.name} refresh",
+                )
+        await asyncio.gather(
+            *(
+                first_refresh_coordinator.async_first_refresh()
+                for first_refresh_coordinator in (coordinator, version_coordinator)
+                if first_refresh_coordinator.data is None
+            )
+        )
+
+    @callback
+    def _async_check_auth() -> None:
+        """Ask for a new API key when the shared stats coordinator was rejected."""
+        if not coordinator.last_update_success and isinstance(
+            coordinator.last_exception, ConfigEntryAuthFailed
+        ):
+            entry.async_start_reauth(hass)
+
+    entry.async_on_unload(coordinator.async_add_listener(_async_check_auth))
+    if restore_cache:
+        entry.async_on_unload(cache.async_track(coordinator, version_coordinator))
+
+    # Every tracked device gets its own outbox and upload queue
+    uploaders: dict[str, DawarichPointUploader] = {}
+    mobile_apps: list[str] = entry.data[CONF_DEVICE]
+    for mobile_app in mobile_apps:
+        uploaders[mobile_app] = await _async_setup_uploader(
+            hass,
+            entry,
+            api,
+            coordinator,
+            mobile_app,
+            get_tracker_name(entry.data[CONF_NAME], mobile_app, len(mobile_apps)),
+        )
+
+    await _async_remove_unused_outboxes(hass, entry)
 
+    # Tracked devices are matched against the areas of the user locally
+    areas_coordinator: DawarichAreasCoordinator | None = None
+    if mobile_apps:
+        areas_coordinator = registry.async_acquire_areas(
+            entry.entry_id, api, lambda: DawarichAreasCoordinator(hass, api)
+        ).coordinator
+        if areas_coordinator.data is None:
+            entry.async_create_background_task(
+                hass, areas_coordinator.async_refresh(), "Dawarich Areas refresh"
+            )
+
+    # The webhook can add uploaders while the entry is loaded
+    webhook_uploaders: dict[str, DawarichPointUploader] = {}
     entry.runtime_data = DawarichConfigEntryData(
-        api=api, coordinator=coordinator, version_coordinator=version_coordinator
+        api=api,
+        coordinator=coordinator,
+        version_coordinator=version_coordinator,
+        uploaders=uploaders,
+        recent_points={
+            mobile_app: DawarichRecentPoints() for mobile_app in mobile_apps
+        },
+        importer=DawarichHistoryImporter(hass, entry.entry_id, api),
+        webhook_uploaders=webhook_uploaders,
+        areas_coordinator=areas_coordinator,
     )
 
+    await _async_setup_webhook(hass, entry, api, coordinator, webhook_uploaders)
+
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
     return True
 
 
-async def async_unload_entry(
-    hass: HomeAssistant, entry: config_entries.ConfigEntry
-) -> bool:
+async def async_reload_entry(hass: HomeAssistant, entry: DawarichConfigEntry) -> None:
+    """Reload the config entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
+async def async_unload_entry(hass: HomeAssistant, entry: DawarichConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id)
+        # Send whatever is still buffered before the entry goes away
+        for uploader in entry.runtime_data.all_uploaders:
+            await uploader.async_shutdown()
 
     return unload_ok
 
 
-# Migration from 1 to 2
+async def async_remove_entry(
+    hass: HomeAssistant, entry: config_entries.ConfigEntry
+) -> None:
+    """Remove the stored outboxes, cache and import checkpoints of an entry."""
+    await DawarichStatsCache(hass, entry.entry_id).async_remove()
+    await async_remove_checkpoints(hass, entry.entry_id)
+    # Also remove the outboxes of devices that are no longer tracked
+    for key in await async_list_outboxes(hass, _outbox_key(entry.entry_id, "")):
+        await DawarichOutbox(hass, key).async_remove()
+
+
+def _outbox_key(entry_id: str, mobile_app: str) -> str:
+    """Return the storage key of the outbox of a tracked device."""
+    return f"{entry_id}.{mobile_app}"
+
+
+async def _async_remove_unused_outboxes(
+    hass: HomeAssistant, entry: DawarichConfigEntry
+) -> None:
+    """Remove the outboxes of devices that were removed from the entry."""
+    used = {
+        _outbox_key(entry.entry_id, mobile_app)
+        for mobile_app in [*entry.data[CONF_DEVICE], WEBHOOK_OUTBOX]
+    }
+    webhook_prefix = _outbox_key(entry.entry_id, f"{WEBHOOK_OUTBOX}.")
+    for key in await async_list_outboxes(hass, _outbox_key(entry.entry_id, "")):
+        if key in used or key.startswith(webhook_prefix):
+            continue
+        outbox = DawarichOutbox(hass, key)
+        await outbox.async_load()
+        if len(outbox):
+            _LOGGER.warning(
+                "Dropping %s unsent points of a device that is no longer tracked",
+                len(outbox),
+            )
+        await outbox.async_remove()
+
+
+async def _async_setup_uploader(
+    hass: HomeAssistant,
+    entry: DawarichConfigEntry,
+    api: DawarichClient,
+    coordinator: DawarichStatsCoordinator,
+    key: str,
+    device_name: str,
+) -> DawarichPointUploader:
+    """Create and start the uploader with the outbox stored under key."""
+    outbox = DawarichOutbox(hass, _outbox_key(entry.entry_id, key))
+    await outbox.async_load()
+    uploader = DawarichPointUploader(
+        hass,
+        api,
+        device_name,
+        outbox,
+        max_batch_size=int(
+            entry.options.get(CONF_MAX_BATCH_SIZE, UPLOAD_MAX_BATCH_SIZE)
+        ),
+        coalesce_window=timedelta(
+            seconds=entry.options.get(CONF_COALESCE_WINDOW, DEFAULT_COALESCE_WINDOW)
+        ),
+        on_auth_failed=partial(entry.async_start_reauth, hass),
+    )
+    uploader.async_start()
+    entry.async_on_unload(uploader.async_add_listener(coordinator.async_handle_upload))
+    return uploader
+
+
+async def _async_setup_webhook(
+    hass: HomeAssistant,
+    entry: DawarichConfigEntry,
+    api: DawarichClient,
+    coordinator: DawarichStatsCoordinator,
+    uploaders: dict[str, DawarichPointUploader],
+) -> None:
+    """Register the webhook if it is enabled, adding its uploaders to uploaders.
+
+    Every device posting to the webhook gets an upload queue of its own,
+    created when its first locations arrive. The queues of devices seen
+    before are set up right away, so their unsent points are replayed. With
+    the webhook disabled only the queues that still hold points are set up,
+    to send them, and the empty ones are removed.
+    """
+    webhook_id = entry.options.get(CONF_WEBHOOK_ID)
+    enabled = bool(entry.options.get(CONF_WEBHOOK, DEFAULT_WEBHOOK) and webhook_id)
+    lock = asyncio.Lock()
+
+    async def async_get_uploader(device: str) -> DawarichPointUploader:
+        """Return the uploader of a device, device being empty if unknown."""
+        key = f"{WEBHOOK_OUTBOX}.{device}" if device else WEBHOOK_OUTBOX
+        async with lock:
+            if (uploader := uploaders.get(key)) is not None:
+                return uploader
+            uploader = uploaders[key] = await _async_setup_uploader(
+                hass,
+                entry,
+                api,
+                coordinator,
+                key,
+                f"{entry.data[CONF_NAME]} {device or WEBHOOK_OUTBOX}",
+            )
+        async_dispatcher_send(hass, SIGNAL_WEBHOOK_UPLOADER.format(entry.entry_id), key)
+        return uploader
+
+    prefix = _outbox_key(entry.entry_id, WEBHOOK_OUTBOX)
+    for key in await async_list_outboxes(hass, prefix):
+        if key != prefix and not key.startswith(f"{prefix}."):
+            continue
+        if not enabled:
+            outbox = DawarichOutbox(hass, key)
+            await outbox.async_load()
+            if not len(outbox):
+                await outbox.async_remove()
+                continue
+        await async_get_uploader(key.removeprefix(prefix).removeprefix("."))
+
+    if not enabled:
+        return
+    entry.async_on_unload(
+        async_register_webhook(
+            hass,
+            webhook_id,
+            entry.title,
+            DawarichWebhook(
+                async_get_uploader,
+                partial(DawarichPointThinner.from_options, entry.options),
+            ),
+        )
+    )
+
+
+# Migration from 1 to 2 and from 2 to 3
 async def async_migrate_entry(hass: HomeAssistant, entry: config_entries.ConfigEntry):
     """Migrate an old entry."""
-    if entry.version > 1:
+    if entry.version > 3:
         # Downgrade not supported
         return False
 
@@ -114,5 +416,24 @@ async def async_migrate_entry(hass: HomeAssistant, entry: config_entries.ConfigE
 
         hass.config_entries.async_update_entry(entry, data=data, version=2)
 
+    if entry.version == 2:
+        # A single optional device tracker became a list of device trackers
+        mobile_app = entry.data.get(CONF_DEVICE)
+        data = {**entry.data, CONF_DEVICE: [mobile_app] if mobile_app else []}
+
+        @callback
+        def _migrate_tracker_unique_id(
+            entity_entry: er.RegistryEntry,
+        ) -> dict[str, str] | None:
+            if entity_entry.unique_id == f"{entry.entry_id}/tracker":
+                return {"new_unique_id": f"{entry.entry_id}/tracker/{mobile_app}"}
+            return None
+
+        if mobile_app:
+            await er.async_migrate_entries(
+                hass, entry.entry_id, _migrate_tracker_unique_id
+            )
+        hass.config_entries.async_update_entry(entry, data=data, version=3)
+
     _LOGGER.info("Migrated %s to config flow version %s", entry.entry_id, entry.version)
     return True
@@ -0,0 +1,225 @@
+"""Dawarich API client used by the integration."""
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+from typing import Any
+
+import aiohttp
+from dawarich_api import DawarichAPI
+from dawarich_api.constants import DawarichV1Endpoint
+from dawarich_api.response_model import (
+    AddOnePointResponse,
+    AreaResponseModel,
+    AreasResponse,
+    DawarichVersion,
+    StatsResponse,
+    StatsResponseModel,
+)
+
+from .models import DawarichPoint, DawarichPointsPage
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _optional_float(value: Any) -> float | None:
+    """Convert a numeric field that may be missing or a string to a float."""
+    return None if value is None else float(value)
+
+
+class DawarichClient(DawarichAPI):
+    """Dawarich API client sending its requests through a shared session.
+
+    The session is Home Assistant's pooled client session, so connections to
+    Dawarich are kept alive and reused between requests and config entries.
+    ``limit`` caps the number of concurrent requests to the host and
+    ``timeout`` bounds how long a single request may take.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        api_key: str,
+        *,
+        session: aiohttp.ClientSession,
+        limit: asyncio.Semaphore,
+        timeout: aiohttp.ClientTimeout,
+        verify_ssl: bool = True,
+    ) -> None:
+        """Initialize the client."""
+        super().__init__(url=url, api_key=api_key, verify_ssl=verify_ssl)
+        self._session = session
+        self._limit = limit
+        self._timeout = timeout
+
+    @asynccontextmanager
+    async def _async_request(
+        self, method: str, path: str, *, with_auth: bool = True, **kwargs: Any
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """Send a request and raise for error statuses."""
+        async with (
+            self._limit,
+            self._session.request(
+                method,
+                self._build_url(path),
+                headers=self._get_headers(with_auth),
+                timeout=self._timeout,
+                **kwargs,
+            ) as response,
+        ):
+            response.raise_for_status()
+            yield response
+
+    def _point_feature(self, point: DawarichPoint, name: str) -> dict[str, Any]:
+        """Build the GeoJSON feature Dawarich expects for a point."""
+        return {
+            "type": "Feature",
+            "geometry": {
+                "type": "Point",
+                "coordinates": [point.longitude, point.latitude],
+            },
+            "properties": {
+                "timestamp": point.timestamp.astimezone(tz=self.timezone).isoformat(),
+                "altitude": point.altitude or 0,
+                "speed": point.speed or 0,
+                "horizontal_accuracy": point.horizontal_accuracy or 0,
+                "vertical_accuracy": point.vertical_accuracy or 0,
+                "significant_change": "unknown",
+                "device_id": name,
+                "wifi": "unknown",
+                "battery_state": "unknown",
+                "battery_level": point.battery or 0,
+                "course": 0,
+                "course_accuracy": 0,
+            },
+        }
+
+    async def add_points(
+        self, points: list[DawarichPoint], name: str
+    ) -> AddOnePointResponse:
+        """Post several points to Dawarich in a single request."""
+        json_data = {"locations": [self._point_feature(p, name) for p in points]}
+        try:
+            async with self._async_request(
+                "POST", DawarichV1Endpoint.API_V1_POINTS, json=json_data
+            ) as response:
+                return AddOnePointResponse(
+                    response_code=response.status,
+                    response=None,
+                    error=response.reason or "",
+                )
+        except (aiohttp.ClientError, TimeoutError) as e:
+            _LOGGER.debug("Failed to add %s points: %s", len(points), e)
+            return AddOnePointResponse(
+                response_code=getattr(e, "status", 500),
+                response=None,
+                error=str(e) or type(e).__name__,
+            )
+
+    async def get_points(
+        self, start: datetime, end: datetime, page: int, per_page: int
+    ) -> DawarichPointsPage | None:
+        """Get a page of the points between start and end, oldest first."""
+        params = {
+            "start_at": start.isoformat(),
+            "end_at": end.isoformat(),
+            "page": page,
+            "per_page": per_page,
+            "order": "asc",
+        }
+        try:
+            async with self._async_request(
+                "GET", DawarichV1Endpoint.API_V1_POINTS, params=params
+            ) as response:
+                data = await response.json()
+                total_pages = response.headers.get("X-Total-Pages")
+            points = [
+                DawarichPoint(
+                    latitude=float(item["latitude"]),
+                    longitude=float(item["longitude"]),
+                    timestamp=datetime.fromtimestamp(int(item["timestamp"]), tz=UTC),
+                    altitude=_optional_float(item.get("altitude")),
+                    speed=_optional_float(item.get("velocity")),
+                    horizontal_accuracy=_optional_float(item.get("accuracy")),
+                    battery=item.get("battery"),
+                )
+                for item in data
+            ]
+        except (aiohttp.ClientError, TimeoutError) as e:
+            _LOGGER.error("Failed to get points from Dawarich: %s", e)
+            return None
+        except (KeyError, TypeError, ValueError) as e:
+            _LOGGER.error("Dawarich returned invalid points: %s", e)
+            return None
+        return DawarichPointsPage(
+            points=points,
+            total_pages=None if total_pages is None else int(total_pages),
+        )
+
+    async def get_stats(self) -> StatsResponse:
+        """Get the stats from the API."""
+        try:
+            async with self._async_request(
+                "GET", DawarichV1Endpoint.API_V1_STATS_PATH
+            ) as response:
+                data = await response.json()
+                return StatsResponse(
+                    response_code=response.status,
+                    response=StatsResponseModel.model_validate(data),
+                )
+        except (aiohttp.ClientError, TimeoutError) as e:
+            _LOGGER.debug("Failed to get stats: %s", e)
+            return StatsResponse(
+                response_code=getattr(e, "status", 500),
+                response=None,
+                error=str(e) or type(e).__name__,
+            )
+
+    async def get_areas(self) -> AreasResponse:
+        """Get the areas of the user from the API."""
+        try:
+            async with self._async_request(
+                "GET", DawarichV1Endpoint.API_V1_AREAS
+            ) as response:
+                data = await response.json()
+                return AreasResponse(
+                    response_code=response.status,
+                    response=[AreaResponseModel.model_validate(d) for d in data],
+                )
+        except (aiohttp.ClientError, TimeoutError) as e:
+            _LOGGER.debug("Failed to get areas: %s", e)
+            return AreasResponse(
+                response_code=getattr(e, "status", 500),
+                response=None,
+                error=str(e) or type(e).__name__,
+            )
+
+    async def health(self) -> DawarichVersion | None:
+        """Get the Dawarich version from the health endpoint.
+
+        Dawarich versions before 0.24 do not report their version and are
+        returned as 0.23.0.
+        """
+        try:
+            async with self._async_request(
+                "GET", DawarichV1Endpoint.API_V1_HEALTH, with_auth=False
+            ) as response:
+                status = (await response.json()).get("status")
+                version = response.headers.get("X-Dawarich-Version")
+        except (aiohttp.ClientError, TimeoutError) as e:
+            _LOGGER.debug("Failed to get health: %s", e)
+            return None
+
+        if status != "ok":
+            return None
+        if not version:
+            return DawarichVersion(major=0, minor=23, patch=0)
+        parts = version.split(".")
+        if len(parts) != 3 or not all(part.isdigit() for part in parts):
+            _LOGGER.error("Invalid Dawarich version format: %s", version)
+            return None
+        return DawarichVersion(
+            major=int(parts[0]), minor=int(parts[1]), patch=int(parts[2])
+        )
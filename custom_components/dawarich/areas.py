@@ -0,0 +1,70 @@
+"""Spatial index of the areas defined in Dawarich."""
+
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from itertools import chain
+from math import cos, degrees, floor, radians
+
+from .const import AREA_GRID_SIZE
+from .helpers import EARTH_RADIUS_M, haversine_distance
+
+# Areas overlapping more cells than this are checked on every lookup instead
+_MAX_CELLS = 64
+
+
+@dataclass(slots=True, frozen=True)
+class DawarichArea:
+    """A circular area defined in Dawarich, with its radius in metres."""
+
+    id: int
+    name: str
+    latitude: float
+    longitude: float
+    radius: float
+
+
+def _cell(degree: float) -> int:
+    """Return the grid row or column of a latitude or longitude."""
+    return floor(degree / AREA_GRID_SIZE)
+
+
+class DawarichAreaIndex:
+    """Find the area a location is in without asking Dawarich.
+
+    Every area is added to the cells of a grid of ``AREA_GRID_SIZE`` degrees
+    that its circle overlaps, so a lookup only measures the distance to the
+    areas of a single cell. When areas overlap the smallest one is returned.
+    """
+
+    def __init__(self, areas: Iterable[DawarichArea]) -> None:
+        """Build the index."""
+        self._cells: defaultdict[tuple[int, int], list[DawarichArea]] = defaultdict(
+            list
+        )
+        self._large: list[DawarichArea] = []
+        for area in areas:
+            d_lat = degrees(area.radius / EARTH_RADIUS_M)
+            d_lon = d_lat / max(cos(radians(area.latitude)), 0.01)
+            rows = range(_cell(area.latitude - d_lat), _cell(area.latitude + d_lat) + 1)
+            columns = range(
+                _cell(area.longitude - d_lon), _cell(area.longitude + d_lon) + 1
+            )
+            if len(rows) * len(columns) > _MAX_CELLS:
+                self._large.append(area)
+                continue
+            for row in rows:
+                for column in columns:
+                    self._cells[row, column].append(area)
+
+    def lookup(self, latitude: float, longitude: float) -> DawarichArea | None:
+        """Return the smallest area containing the location, if any."""
+        found: DawarichArea | None = None
+        for area in chain(
+            self._cells.get((_cell(latitude), _cell(longitude)), ()), self._large
+        ):
+            if (found is None or area.radius < found.radius) and haversine_distance(
+                latitude, longitude, area.latitude, area.longitude
+            ) <= area.radius:
+                found = area
+        return found
@@ -0,0 +1,82 @@
+"""Cache of the last known Dawarich stats and version of an entry."""
+
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import CACHE_SAVE_DELAY, CACHE_STORAGE_VERSION, DOMAIN
+from .coordinator import (
+    DawarichCoordinator,
+    DawarichStatsCoordinator,
+    DawarichVersionCoordinator,
+)
+
+
+class DawarichStatsCache:
+    """Keep the coordinator data of an entry across restarts.
+
+    Restoring the cache lets the entities come up with their last known
+    values while fresh data is fetched in the background.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the cache."""
+        self._store: Store[dict[str, dict[str, Any] | None]] = Store(
+            hass, CACHE_STORAGE_VERSION, f"{DOMAIN}.cache.{entry_id}"
+        )
+
+    async def async_restore(
+        self,
+        coordinator: DawarichStatsCoordinator,
+        version_coordinator: DawarichVersionCoordinator,
+    ) -> list[DawarichCoordinator]:
+        """Set the cached data on the coordinators without data, return them.
+
+        Coordinators shared with an entry that is already set up keep their
+        data. Nothing is restored if the cache is missing or incomplete.
+        """
+        data = await self._store.async_load()
+        if data is None or data["stats"] is None or data["version"] is None:
+            return []
+        restored: list[DawarichCoordinator] = []
+        for restore_coordinator, restore_data in (
+            (coordinator, data["stats"]),
+            (version_coordinator, data["version"]),
+        ):
+            if restore_coordinator.data is None:
+                restore_coordinator.async_set_updated_data(restore_data)
+                restored.append(restore_coordinator)
+        return restored
+
+    @callback
+    def async_track(
+        self,
+        coordinator: DawarichStatsCoordinator,
+        version_coordinator: DawarichVersionCoordinator,
+    ) -> CALLBACK_TYPE:
+        """Save the coordinator data whenever it is updated."""
+
+        @callback
+        def _data_to_save() -> dict[str, dict[str, Any] | None]:
+            return {"stats": coordinator.data, "version": version_coordinator.data}
+
+        @callback
+        def _async_schedule_save() -> None:
+            self._store.async_delay_save(_data_to_save, CACHE_SAVE_DELAY)
+
+        remove_stats_listener = coordinator.async_add_listener(_async_schedule_save)
+        remove_version_listener = version_coordinator.async_add_listener(
+            _async_schedule_save
+        )
+
+        @callback
+        def remove_listeners() -> None:
+            remove_stats_listener()
+            remove_version_listener()
+
+        return remove_listeners
+
+    async def async_remove(self) -> None:
+        """Remove the cache from disk."""
+        await self._store.async_remove()
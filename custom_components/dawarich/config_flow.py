@@ -6,6 +6,7 @@ from typing import Any
 
 import voluptuous as vol
 from homeassistant import config_entries
+from homeassistant.components import webhook
 from homeassistant.const import (
     CONF_API_KEY,
     CONF_HOST,
@@ -13,16 +14,52 @@ from homeassistant.const import (
     CONF_PORT,
     CONF_SSL,
     CONF_VERIFY_SSL,
+    CONF_WEBHOOK_ID,
+    UnitOfLength,
+    UnitOfSpeed,
+    UnitOfTime,
 )
+from homeassistant.core import callback
 from homeassistant.helpers import selector
+from homeassistant.helpers.network import NoURLAvailableError
 
 from .const import (
+    CONF_COALESCE_BATTERY,
+    CONF_COALESCE_WINDOW,
     CONF_DEVICE,
+    CONF_MAX_ACCURACY,
+    CONF_MAX_BATCH_SIZE,
+    CONF_MAX_CONNECTIONS,
+    CONF_MAX_SPEED,
+    CONF_MIN_DISTANCE,
+    CONF_MIN_INTERVAL,
+    CONF_RESTORE_CACHE,
+    CONF_SIMPLIFY_TOLERANCE,
+    CONF_SMOOTHING,
+    CONF_STATS_MAX_INTERVAL,
+    CONF_STATS_MIN_INTERVAL,
+    CONF_TIMEOUT,
+    CONF_WEBHOOK,
+    DEFAULT_COALESCE_BATTERY,
+    DEFAULT_COALESCE_WINDOW,
+    DEFAULT_MAX_ACCURACY,
+    DEFAULT_MAX_CONNECTIONS,
+    DEFAULT_MAX_SPEED,
+    DEFAULT_MIN_DISTANCE,
+    DEFAULT_MIN_INTERVAL,
     DEFAULT_NAME,
     DEFAULT_PORT,
+    DEFAULT_RESTORE_CACHE,
+    DEFAULT_SIMPLIFY_TOLERANCE,
+    DEFAULT_SMOOTHING,
     DEFAULT_SSL,
+    DEFAULT_TIMEOUT,
     DEFAULT_VERIFY_SSL,
+    DEFAULT_WEBHOOK,
     DOMAIN,
+    STATS_MAX_UPDATE_INTERVAL,
+    UPDATE_INTERVAL,
+    UPLOAD_MAX_BATCH_SIZE,
 )
 from .helpers import get_api
 
@@ -32,13 +69,21 @@ _LOGGER = logging.getLogger(__name__)
 class DawarichConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Dawarich."""
 
-    VERSION = 2
+    VERSION = 3
 
     def __init__(self) -> None:
         """Initialize Dawarich config flow."""
         self._config: dict[str, Any] = {}
         self._reconfigure_entry: config_entries.ConfigEntry | None = None
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> config_entries.OptionsFlow:
+        """Get the options flow for this handler."""
+        return DawarichOptionsFlow()
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> config_entries.ConfigFlowResult:
@@ -51,7 +96,7 @@ class DawarichConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 CONF_NAME: user_input[CONF_NAME],
                 CONF_SSL: user_input[CONF_SSL],
                 CONF_VERIFY_SSL: user_input[CONF_VERIFY_SSL],
-                CONF_DEVICE: user_input.get(CONF_DEVICE),
+                CONF_DEVICE: user_input.get(CONF_DEVICE, []),
             }
 
             self._async_abort_entries_match(
@@ -82,9 +127,11 @@ class DawarichConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                         CONF_NAME, default=user_input.get(CONF_NAME, DEFAULT_NAME)
                     ): str,
                     vol.Optional(
-                        CONF_DEVICE, msg="If you want to track your device"
+                        CONF_DEVICE, msg="If you want to track your devices"
                     ): selector.EntitySelector(
-                        selector.EntitySelectorConfig(domain="device_tracker")
+                        selector.EntitySelectorConfig(
+                            domain="device_tracker", multiple=True
+                        )
                     ),
                     vol.Required(
                         CONF_SSL, default=user_input.get(CONF_SSL, DEFAULT_SSL)
@@ -212,7 +259,7 @@ class DawarichConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 CONF_NAME: user_input[CONF_NAME],
                 CONF_SSL: user_input[CONF_SSL],
                 CONF_VERIFY_SSL: user_input[CONF_VERIFY_SSL],
-                CONF_DEVICE: user_input.get(CONF_DEVICE),
+                CONF_DEVICE: user_input.get(CONF_DEVICE, []),
                 CONF_API_KEY: new_api_key,
             }
 
@@ -253,7 +300,9 @@ class DawarichConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                         CONF_DEVICE,
                         description={"suggested_value": current_data.get(CONF_DEVICE)},
                     ): selector.EntitySelector(
-                        selector.EntitySelectorConfig(domain="device_tracker")
+                        selector.EntitySelectorConfig(
+                            domain="device_tracker", multiple=True
+                        )
                     ),
                     vol.Required(
                         CONF_SSL,
@@ -285,7 +334,7 @@ class DawarichConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         api_key = self._config[CONF_API_KEY]
         verify_ssl = self._config[CONF_VERIFY_SSL]
 
-        api = get_api(host, api_key, use_ssl, verify_ssl)
+        api = get_api(self.hass, host, api_key, use_ssl, verify_ssl)
 
         # TODO: We should do a health check to see if the API is reachable
         # that way we can display if it is a connection issue or an invalid API key
@@ -298,3 +347,121 @@ class DawarichConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 return {CONF_API_KEY: "invalid api key"}
             case _:
                 return {"base": "connection_error"}
+
+
+class DawarichOptionsFlow(config_entries.OptionsFlow):
+    """Handle Dawarich options."""
+
+    _webhook_id: str | None = None
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> config_entries.ConfigFlowResult:
+        """Manage the tracker options."""
+        options = self.config_entry.options
+        # Keep the webhook at the same URL when the options change again
+        if self._webhook_id is None:
+            self._webhook_id = (
+                options.get(CONF_WEBHOOK_ID) or webhook.async_generate_id()
+            )
+        webhook_id = self._webhook_id
+        if user_input is not None:
+            return self.async_create_entry(
+                data={**user_input, CONF_WEBHOOK_ID: webhook_id}
+            )
+
+        try:
+            webhook_url = webhook.async_generate_url(self.hass, webhook_id)
+        except NoURLAvailableError:
+            webhook_url = webhook.async_generate_path(webhook_id)
+        return self.async_show_form(
+            step_id="init",
+            description_placeholders={"webhook_url": webhook_url},
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_MIN_DISTANCE,
+                        default=options.get(CONF_MIN_DISTANCE, DEFAULT_MIN_DISTANCE),
+                    ): _number_selector(UnitOfLength.METERS),
+                    vol.Required(
+                        CONF_MIN_INTERVAL,
+                        default=options.get(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL),
+                    ): _number_selector(UnitOfTime.SECONDS),
+                    vol.Required(
+                        CONF_SIMPLIFY_TOLERANCE,
+                        default=options.get(
+                            CONF_SIMPLIFY_TOLERANCE, DEFAULT_SIMPLIFY_TOLERANCE
+                        ),
+                    ): _number_selector(UnitOfLength.METERS),
+                    vol.Required(
+                        CONF_MAX_ACCURACY,
+                        default=options.get(CONF_MAX_ACCURACY, DEFAULT_MAX_ACCURACY),
+                    ): _number_selector(UnitOfLength.METERS),
+                    vol.Required(
+                        CONF_MAX_SPEED,
+                        default=options.get(CONF_MAX_SPEED, DEFAULT_MAX_SPEED),
+                    ): _number_selector(UnitOfSpeed.KILOMETERS_PER_HOUR),
+                    vol.Required(
+                        CONF_SMOOTHING,
+                        default=options.get(CONF_SMOOTHING, DEFAULT_SMOOTHING),
+                    ): bool,
+                    vol.Required(
+                        CONF_COALESCE_WINDOW,
+                        default=options.get(
+                            CONF_COALESCE_WINDOW, DEFAULT_COALESCE_WINDOW
+                        ),
+                    ): _number_selector(UnitOfTime.SECONDS),
+                    vol.Required(
+                        CONF_COALESCE_BATTERY,
+                        default=options.get(
+                            CONF_COALESCE_BATTERY, DEFAULT_COALESCE_BATTERY
+                        ),
+                    ): bool,
+                    vol.Required(
+                        CONF_MAX_BATCH_SIZE,
+                        default=options.get(CONF_MAX_BATCH_SIZE, UPLOAD_MAX_BATCH_SIZE),
+                    ): _number_selector(None, minimum=1),
+                    vol.Required(
+                        CONF_MAX_CONNECTIONS,
+                        default=options.get(
+                            CONF_MAX_CONNECTIONS, DEFAULT_MAX_CONNECTIONS
+                        ),
+                    ): _number_selector(None, minimum=1),
+                    vol.Required(
+                        CONF_TIMEOUT,
+                        default=options.get(CONF_TIMEOUT, DEFAULT_TIMEOUT),
+                    ): _number_selector(UnitOfTime.SECONDS, minimum=1),
+                    vol.Required(
+                        CONF_STATS_MIN_INTERVAL,
+                        default=options.get(
+                            CONF_STATS_MIN_INTERVAL, UPDATE_INTERVAL.total_seconds()
+                        ),
+                    ): _number_selector(UnitOfTime.SECONDS, minimum=10),
+                    vol.Required(
+                        CONF_STATS_MAX_INTERVAL,
+                        default=options.get(
+                            CONF_STATS_MAX_INTERVAL,
+                            STATS_MAX_UPDATE_INTERVAL.total_seconds(),
+                        ),
+                    ): _number_selector(UnitOfTime.SECONDS, minimum=10),
+                    vol.Required(
+                        CONF_RESTORE_CACHE,
+                        default=options.get(CONF_RESTORE_CACHE, DEFAULT_RESTORE_CACHE),
+                    ): bool,
+                    vol.Required(
+                        CONF_WEBHOOK,
+                        default=options.get(CONF_WEBHOOK, DEFAULT_WEBHOOK),
+                    ): bool,
+                }
+            ),
+        )
+
+
+def _number_selector(unit: str | None, minimum: float = 0) -> selector.NumberSelector:
+    """Return a selector for a number entered in a box."""
+    config = selector.NumberSelectorConfig(
+        min=minimum, mode=selector.NumberSelectorMode.BOX
+    )
+    if unit is not None:
+        config["unit_of_measurement"] = unit
+    return selector.NumberSelector(config)
@@ -11,8 +11,73 @@ DEFAULT_NAME = "Dawarich"
 DEFAULT_SSL = False
 DEFAULT_VERIFY_SSL = True
 CONF_DEVICE = "mobile_app"
+CONF_MAX_CONNECTIONS = "max_connections"
+CONF_TIMEOUT = "timeout"
+CONF_MIN_DISTANCE = "min_distance"
+CONF_MIN_INTERVAL = "min_interval"
+CONF_SIMPLIFY_TOLERANCE = "simplify_tolerance"
+CONF_COALESCE_WINDOW = "coalesce_window"
+CONF_COALESCE_BATTERY = "coalesce_battery"
+CONF_MAX_ACCURACY = "max_accuracy"
+CONF_MAX_SPEED = "max_speed"
+CONF_SMOOTHING = "smoothing"
+CONF_MAX_BATCH_SIZE = "max_batch_size"
+CONF_STATS_MIN_INTERVAL = "stats_min_interval"
+CONF_STATS_MAX_INTERVAL = "stats_max_interval"
+CONF_RESTORE_CACHE = "restore_cache"
+CONF_WEBHOOK = "webhook"
+DEFAULT_MAX_CONNECTIONS = 4
+DEFAULT_TIMEOUT = 30
+DEFAULT_MIN_DISTANCE = 0
+DEFAULT_MIN_INTERVAL = 0
+DEFAULT_SIMPLIFY_TOLERANCE = 0
+DEFAULT_COALESCE_WINDOW = 0
+DEFAULT_COALESCE_BATTERY = False
+DEFAULT_MAX_ACCURACY = 0
+DEFAULT_MAX_SPEED = 0
+DEFAULT_SMOOTHING = False
+DEFAULT_RESTORE_CACHE = False
+DEFAULT_WEBHOOK = False
+DATA_CONNECTION_LIMITS = f"{DOMAIN}_connection_limits"
+DATA_COORDINATORS = f"{DOMAIN}_coordinators"
 UPDATE_INTERVAL = timedelta(seconds=60)
+STATS_MAX_UPDATE_INTERVAL = timedelta(minutes=30)
+STATS_REFRESH_JITTER = timedelta(seconds=15)
 VERSION_UPDATE_INTERVAL = timedelta(hours=1)
+AREAS_UPDATE_INTERVAL = timedelta(hours=1)
+AREA_GRID_SIZE = 0.01
+TRIP_STAY_RADIUS = 100
+TRIP_STAY_DURATION = timedelta(minutes=5)
+TRIP_MIN_SPEED = 2
+RECENT_POINTS_SIZE = 500
+FILTER_ACCELERATION = 1
+FILTER_MAX_REJECTED = 3
+FILTER_RESET_INTERVAL = timedelta(minutes=10)
+UPLOAD_BATCH_SIZE = 50
+UPLOAD_FLUSH_INTERVAL = timedelta(seconds=30)
+UPLOAD_MAX_BATCH_SIZE = 500
+UPLOAD_RETRY_MIN_DELAY = timedelta(seconds=10)
+UPLOAD_RETRY_MAX_DELAY = timedelta(minutes=15)
+# Past this many doublings the retry delay is capped by UPLOAD_RETRY_MAX_DELAY
+UPLOAD_RETRY_MAX_DOUBLINGS = 16
+CIRCUIT_BREAKER_THRESHOLD = 5
+OUTBOX_STORAGE_VERSION = 1
+OUTBOX_MAX_POINTS = 20000
+OUTBOX_SAVE_DELAY = 10
+CACHE_STORAGE_VERSION = 1
+CACHE_SAVE_DELAY = 60
+WEBHOOK_OUTBOX = "webhook"
+# Sent with the key of an uploader the webhook added, formatted with the entry id
+SIGNAL_WEBHOOK_UPLOADER = f"{DOMAIN}_{{}}_webhook_uploader"
+IMPORT_STORAGE_VERSION = 1
+IMPORT_WINDOW = timedelta(days=1)
+IMPORT_BATCH_SIZE = 1000
+EXPORT_PAGE_SIZE = 1000
+EVENT_IMPORT_PROGRESS = f"{DOMAIN}_import_history_progress"
+# Upper bounds in seconds of the telemetry histogram buckets
+UPLOAD_LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+POINT_DELAY_BUCKETS = (1, 5, 15, 30, 60, 300, 900, 3600)
+REFRESH_DURATION_BUCKETS = UPLOAD_LATENCY_BUCKETS
 
 
 class DawarichTrackerStates(Enum):
@@ -1,29 +1,186 @@
 """Custom coordinator for Dawarich integration."""
 
 import logging
+import time
+from abc import ABC, abstractmethod
+from datetime import date, timedelta
 from typing import Any
 
 from dawarich_api import DawarichAPI
-from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryAuthFailed
+from dawarich_api.response_model import StatsResponseModel
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryAuthFailed, ConfigEntryNotReady
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
-from .const import UPDATE_INTERVAL, VERSION_UPDATE_INTERVAL
+from .areas import DawarichArea, DawarichAreaIndex
+from .const import (
+    AREAS_UPDATE_INTERVAL,
+    REFRESH_DURATION_BUCKETS,
+    STATS_MAX_UPDATE_INTERVAL,
+    UPDATE_INTERVAL,
+    VERSION_UPDATE_INTERVAL,
+)
+from .helpers import is_auth_error
+from .telemetry import DawarichHistogram
 
 _LOGGER = logging.getLogger(__name__)
 
+# Dawarich keys the monthly distances by the English name of the month
+_MONTHS = (
+    "january",
+    "february",
+    "march",
+    "april",
+    "may",
+    "june",
+    "july",
+    "august",
+    "september",
+    "october",
+    "november",
+    "december",
+)
 
-class DawarichStatsCoordinator(DataUpdateCoordinator):
-    """Custom coordinator."""
 
-    def __init__(self, hass: HomeAssistant, api: DawarichAPI):
+def _period_stats(stats: StatsResponseModel, today: date) -> dict[str, Any]:
+    """Return the stats of the current year, current month and previous month.
+
+    Dawarich only breaks the distance down per month, the countries and
+    cities visited are only available per year.
+    """
+    years = {year.year: year for year in stats.yearly_stats}
+    previous = today.replace(day=1) - timedelta(days=1)
+
+    def month_distance(day: date) -> float:
+        if (year := years.get(day.year)) is None:
+            return 0
+        return year.monthly_distance_km.get(_MONTHS[day.month - 1], 0)
+
+    data: dict[str, Any] = {
+        "current_year_distance_km": 0,
+        "current_year_countries_visited": 0,
+        "current_year_cities_visited": 0,
+    }
+    if (current_year := years.get(today.year)) is not None:
+        data["current_year_distance_km"] = current_year.total_distance_km
+        data["current_year_countries_visited"] = current_year.total_countries_visited
+        data["current_year_cities_visited"] = current_year.total_cities_visited
+    return data | {
+        "current_month_distance_km": month_distance(today),
+        "previous_month_distance_km": month_distance(previous),
+    }
+
+
+class DawarichCoordinator(DataUpdateCoordinator, ABC):
+    """Coordinator that keeps track of how long fetching its data takes.
+
+    Coordinators can be shared by several config entries, so they are not
+    bound to one. Every scheduled refresh is pushed back by ``refresh_delay``
+    seconds, which staggers coordinators polling the same server without
+    delaying requested refreshes.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize coordinator."""
+        super().__init__(*args, config_entry=None, **kwargs)
+        self.refresh_duration = DawarichHistogram(REFRESH_DURATION_BUCKETS)
+        self.refresh_delay = 0.0
+
+    async def async_first_refresh(self) -> None:
+        """Refresh the data while setting up an entry, raise if that fails."""
+        await self.async_refresh()
+        if self.last_update_success:
+            return
+        if isinstance(self.last_exception, ConfigEntryAuthFailed):
+            raise ConfigEntryAuthFailed from self.last_exception
+        raise ConfigEntryNotReady from self.last_exception
+
+    @callback
+    def _schedule_refresh(self) -> None:
+        """Schedule the next refresh, refresh_delay seconds later than usual."""
+        if not self.refresh_delay or self.update_interval is None:
+            super()._schedule_refresh()
+            return
+        self._async_unsub_refresh()
+        self._unsub_refresh = async_call_later(
+            self.hass,
+            self.update_interval.total_seconds() + self.refresh_delay,
+            self._handle_refresh_interval,
+        )
+
+    async def _async_update_data(self) -> Any:
+        start = time.monotonic()
+        try:
+            return await self._async_fetch_data()
+        finally:
+            self.refresh_duration.observe(time.monotonic() - start)
+
+    @abstractmethod
+    async def _async_fetch_data(self) -> Any:
+        """Fetch the data from Dawarich."""
+
+
+class DawarichStatsCoordinator(DawarichCoordinator):
+    """Custom coordinator.
+
+    The stats are polled every ``min_interval`` while they keep changing. Each
+    time a poll returns the same stats as the previous one the interval is
+    doubled, up to ``max_interval``, and it goes back to ``min_interval`` as
+    soon as the stats change or new points have been uploaded.
+
+    Only the fields used by the sensors are kept, with the yearly breakdown
+    reduced to the current year and month and the previous month, and
+    listeners are only called when those fields changed.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: DawarichAPI,
+        min_interval: timedelta = UPDATE_INTERVAL,
+        max_interval: timedelta = STATS_MAX_UPDATE_INTERVAL,
+    ):
         """Initialize coordinator."""
         super().__init__(
-            hass, _LOGGER, name="Dawarich Sensor", update_interval=UPDATE_INTERVAL
+            hass,
+            _LOGGER,
+            name="Dawarich Sensor",
+            update_interval=min_interval,
+            always_update=False,
         )
         self.api = api
+        self._min_interval = min_interval
+        self._max_interval = max(min_interval, max_interval)
+        self._points_uploaded = False
 
-    async def _async_update_data(self) -> dict[str, Any]:
+    @callback
+    def async_handle_upload(self, success: bool) -> None:
+        """Poll at the fastest interval again once new points were uploaded."""
+        if not success:
+            return
+        self._points_uploaded = True
+        if self.update_interval == self._min_interval:
+            return
+        self.update_interval = self._min_interval
+        self.hass.async_create_background_task(
+            self.async_request_refresh(), name="dawarich stats refresh"
+        )
+
+    @callback
+    def _async_adapt_interval(self, data: dict[str, Any]) -> None:
+        """Back off while the stats stay the same."""
+        points_uploaded, self._points_uploaded = self._points_uploaded, False
+        if data != self.data or points_uploaded or self.update_interval is None:
+            self.update_interval = self._min_interval
+            return
+        self.update_interval = min(self.update_interval * 2, self._max_interval)
+        _LOGGER.debug(
+            "Dawarich stats did not change, next update in %s", self.update_interval
+        )
+
+    async def _async_fetch_data(self) -> dict[str, Any]:
         response = await self.api.get_stats()
         match response.response_code:
             case 200:
@@ -32,7 +189,10 @@ class DawarichStatsCoordinator(DataUpdateCoordinator):
                         "Dawarich API returned no data but returned status 200"
                     )
                     raise UpdateFailed("Dawarich API returned no data")
-                return response.response.model_dump()
+                data = response.response.model_dump(exclude={"yearly_stats"})
+                data.update(_period_stats(response.response, dt_util.now().date()))
+                self._async_adapt_interval(data)
+                return data
             case 401:
                 _LOGGER.error(
                     "Invalid credentials when trying to fetch stats from Dawarich"
@@ -40,9 +200,7 @@ class DawarichStatsCoordinator(DataUpdateCoordinator):
                 raise ConfigEntryAuthFailed("Invalid API key")
             case _:
                 # Check if error message indicates an authentication issue
-                # Some servers return 500 but include 401/Unauthorized in the error
-                error_str = str(response.error) if response.error else ""
-                if "401" in error_str or "unauthorized" in error_str:
+                if is_auth_error(response.response_code, response.error):
                     _LOGGER.error(
                         "Invalid credentials when trying to fetch stats from Dawarich (status %s)",
                         response.response_code,
@@ -59,7 +217,7 @@ class DawarichStatsCoordinator(DataUpdateCoordinator):
                 )
 
 
-class DawarichVersionCoordinator(DataUpdateCoordinator):
+class DawarichVersionCoordinator(DawarichCoordinator):
     """Custom coordinator for Dawarich version."""
 
     def __init__(self, hass: HomeAssistant, api: DawarichAPI):
@@ -69,12 +227,54 @@ class DawarichVersionCoordinator(DataUpdateCoordinator):
             _LOGGER,
             name="Dawarich Version",
             update_interval=VERSION_UPDATE_INTERVAL,
+            always_update=False,
         )
         self.api = api
 
-    async def _async_update_data(self) -> dict[str, int]:
+    async def _async_fetch_data(self) -> dict[str, int]:
         response = await self.api.health()
         if response is None:
             _LOGGER.error("Dawarich API returned no data")
             raise UpdateFailed("Dawarich API returned no data")
         return response.model_dump()
+
+
+class DawarichAreasCoordinator(DawarichCoordinator):
+    """Coordinator for the areas of a Dawarich user.
+
+    Areas rarely change, so they are only fetched every
+    ``AREAS_UPDATE_INTERVAL``. Locations are looked up locally in ``index``,
+    which is rebuilt whenever the areas changed.
+    """
+
+    def __init__(self, hass: HomeAssistant, api: DawarichAPI):
+        """Initialize coordinator."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name="Dawarich Areas",
+            update_interval=AREAS_UPDATE_INTERVAL,
+            always_update=False,
+        )
+        self.api = api
+        self.index = DawarichAreaIndex(())
+
+    async def _async_fetch_data(self) -> list[DawarichArea]:
+        response = await self.api.get_areas()
+        if response.response is None:
+            raise UpdateFailed(
+                f"Error fetching areas from Dawarich (status {response.response_code})"
+            )
+        areas = [
+            DawarichArea(
+                id=area.id,
+                name=area.name,
+                latitude=area.latitude,
+                longitude=area.longitude,
+                radius=area.radius,
+            )
+            for area in response.response
+        ]
+        if areas != self.data:
+            self.index = DawarichAreaIndex(areas)
+        return areas
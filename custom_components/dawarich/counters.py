@@ -0,0 +1,132 @@
+"""Distance and points of a device per day and per week."""
+
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from enum import StrEnum
+
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.util import dt as dt_util
+
+from .helpers import haversine_distance
+from .models import DawarichPoint
+
+
+class DawarichCounterPeriod(StrEnum):
+    """Period after which the counters start again."""
+
+    DAY = "day"
+    WEEK = "week"
+
+
+def period_start(period: DawarichCounterPeriod, moment: datetime) -> datetime:
+    """Return the local start of the period containing moment."""
+    start = dt_util.start_of_local_day(dt_util.as_local(moment))
+    if period is DawarichCounterPeriod.WEEK:
+        start = dt_util.start_of_local_day(
+            start.date() - timedelta(days=start.weekday())
+        )
+    return start
+
+
+class DawarichDistanceCounter:
+    """Count the distance and the points sent for a device in a period.
+
+    Every point that is queued for Dawarich adds the distance from the
+    previous one, so the counters are kept without asking Dawarich. A point
+    that replaces the last one in the queue takes its place in the counters
+    too. Points older than the last one are not counted, and the counters
+    start from zero at the local start of every day or week (weeks start on
+    Monday).
+    """
+
+    def __init__(
+        self, period: DawarichCounterPeriod, last: DawarichPoint | None = None
+    ) -> None:
+        """Initialize the counter, last being the last known location."""
+        self.period = period
+        self.start = period_start(period, dt_util.utcnow())
+        self.distance = 0.0
+        self.points = 0
+        self._last = last
+        self._previous: DawarichPoint | None = None
+        # Distance added by the last point, None if it was not counted now
+        self._step: float | None = None
+        self._listeners: list[Callable[[], None]] = []
+
+    @callback
+    def async_add_listener(self, update_callback: Callable[[], None]) -> CALLBACK_TYPE:
+        """Listen for changes of the counters."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def async_restore(
+        self,
+        last_reset: datetime,
+        distance: float | None = None,
+        points: int | None = None,
+    ) -> None:
+        """Restore counters saved before a restart if their period is current."""
+        if last_reset != self.start:
+            return
+        if distance is not None:
+            self.distance = distance
+        if points is not None:
+            self.points = points
+
+    @callback
+    def async_add_point(
+        self, point: DawarichPoint, replaces_last: bool = False
+    ) -> None:
+        """Count a point that is sent to Dawarich.
+
+        With replaces_last the point is sent instead of the last point.
+        """
+        last = self._last
+        if last is not None and point.timestamp <= last.timestamp:
+            return
+        rolled = self._async_roll(point.timestamp)
+        if replaces_last and not rolled and self._step is not None:
+            # Count from the point before the one that is not sent
+            self.distance -= self._step
+            self.points -= 1
+            last = self._previous
+        step = 0.0
+        if last is not None:
+            step = haversine_distance(
+                last.latitude, last.longitude, point.latitude, point.longitude
+            )
+        self.distance += step
+        self.points += 1
+        self._previous = last
+        self._last = point
+        self._step = step
+        self._async_notify()
+
+    @callback
+    def async_roll(self, now: datetime) -> None:
+        """Start the counters again when a new period started."""
+        if self._async_roll(now):
+            self._async_notify()
+
+    @callback
+    def _async_roll(self, now: datetime) -> bool:
+        """Reset the counters in a new period, return whether they were reset."""
+        if (start := period_start(self.period, now)) <= self.start:
+            return False
+        self.start = start
+        self.distance = 0.0
+        self.points = 0
+        self._step = None
+        return True
+
+    @callback
+    def _async_notify(self) -> None:
+        """Tell the listeners the counters changed."""
+        for update_callback in self._listeners:
+            update_callback()
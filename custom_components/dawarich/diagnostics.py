@@ -0,0 +1,60 @@
+"""Diagnostics support for the Dawarich integration."""
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.const import CONF_API_KEY, CONF_WEBHOOK_ID
+from homeassistant.core import HomeAssistant
+
+from . import DawarichConfigEntry
+from .coordinator import DawarichCoordinator
+from .uploader import DawarichPointUploader
+
+TO_REDACT = {CONF_API_KEY, CONF_WEBHOOK_ID}
+
+
+def _coordinator_diagnostics(coordinator: DawarichCoordinator) -> dict[str, Any]:
+    """Return the diagnostics of a coordinator."""
+    return {
+        "last_update_success": coordinator.last_update_success,
+        "update_interval": coordinator.update_interval,
+        "refresh_duration": coordinator.refresh_duration.as_dict(),
+    }
+
+
+def _uploader_diagnostics(uploader: DawarichPointUploader) -> dict[str, Any]:
+    """Return the diagnostics of an uploader."""
+    return {
+        "device_name": uploader.device_name,
+        "queued_points": uploader.queued_points,
+        "consecutive_failures": uploader.consecutive_failures,
+        "circuit_open": uploader.circuit_open,
+        **uploader.telemetry.as_dict(),
+    }
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: DawarichConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    runtime_data = entry.runtime_data
+    uploads = {
+        key: _uploader_diagnostics(uploader)
+        for key, uploader in (
+            runtime_data.uploaders | runtime_data.webhook_uploaders
+        ).items()
+    }
+    coordinators = {
+        "stats": _coordinator_diagnostics(runtime_data.coordinator),
+        "version": _coordinator_diagnostics(runtime_data.version_coordinator),
+    }
+    if runtime_data.areas_coordinator is not None:
+        coordinators["areas"] = _coordinator_diagnostics(runtime_data.areas_coordinator)
+    return {
+        "entry": {
+            "data": async_redact_data(entry.data, TO_REDACT),
+            "options": async_redact_data(entry.options, TO_REDACT),
+        },
+        "coordinators": coordinators,
+        "uploads": uploads,
+    }
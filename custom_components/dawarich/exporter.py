@@ -0,0 +1,169 @@
+"""Export of Dawarich points to GPX and GeoJSON files."""
+
+import json
+import logging
+from datetime import UTC, datetime
+from enum import StrEnum
+from pathlib import Path
+from typing import TextIO
+from xml.sax.saxutils import escape, quoteattr
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+from .api import DawarichClient
+from .const import EXPORT_PAGE_SIZE
+from .models import DawarichPoint
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ExportFormat(StrEnum):
+    """File formats points can be exported to."""
+
+    GPX = "gpx"
+    GEOJSON = "geojson"
+
+
+class _GpxWriter:
+    """Write points as a single GPX track."""
+
+    def header(self, name: str) -> str:
+        """Return the start of the file."""
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<gpx version="1.1" creator="Dawarich Home Assistant" '
+            'xmlns="http://www.topografix.com/GPX/1/1">\n'
+            f"<trk><name>{escape(name)}</name><trkseg>\n"
+        )
+
+    def points(self, points: list[DawarichPoint]) -> str:
+        """Return the track points of points."""
+        return "".join(
+            f"<trkpt lat={quoteattr(str(point.latitude))} "
+            f"lon={quoteattr(str(point.longitude))}>"
+            + ("" if point.altitude is None else f"<ele>{point.altitude}</ele>")
+            + f"<time>{point.timestamp.astimezone(UTC):%Y-%m-%dT%H:%M:%SZ}</time>"
+            "</trkpt>\n"
+            for point in points
+        )
+
+    def footer(self) -> str:
+        """Return the end of the file."""
+        return "</trkseg></trk>\n</gpx>\n"
+
+
+class _GeoJsonWriter:
+    """Write points as a GeoJSON feature collection."""
+
+    def __init__(self) -> None:
+        """Initialize the writer."""
+        self._first = True
+
+    def header(self, name: str) -> str:
+        """Return the start of the file."""
+        return f'{{"type": "FeatureCollection", "name": {json.dumps(name)}, "features": [\n'
+
+    def points(self, points: list[DawarichPoint]) -> str:
+        """Return the features of points, separated from earlier features."""
+        features = ",\n".join(json.dumps(self._feature(point)) for point in points)
+        if not self._first:
+            features = ",\n" + features
+        self._first = False
+        return features
+
+    def footer(self) -> str:
+        """Return the end of the file."""
+        return "\n]}\n"
+
+    @staticmethod
+    def _feature(point: DawarichPoint) -> dict:
+        """Return the GeoJSON feature of a point."""
+        coordinates = [point.longitude, point.latitude]
+        if point.altitude is not None:
+            coordinates.append(point.altitude)
+        properties = {
+            key: value
+            for key, value in point.as_dict().items()
+            if value is not None and key not in ("latitude", "longitude", "altitude")
+        }
+        return {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": coordinates},
+            "properties": properties,
+        }
+
+
+def _open(path: Path) -> TextIO:
+    """Open a file for writing, creating its directory if needed."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path.open("w", encoding="utf-8")
+
+
+def _finish(file: TextIO, path: Path, target: Path | None) -> None:
+    """Close the file and move it to target, or remove it without target."""
+    file.close()
+    if target is None:
+        path.unlink(missing_ok=True)
+    else:
+        path.replace(target)
+
+
+async def async_export_points(
+    hass: HomeAssistant,
+    api: DawarichClient,
+    filename: str,
+    export_format: ExportFormat,
+    start: datetime,
+    end: datetime,
+    name: str,
+) -> int:
+    """Write the points between start and end to filename, return their number.
+
+    The points are fetched and written one page at a time, so only a single
+    page is held in memory. The file is written next to filename first and
+    only replaces it once the export is complete.
+    """
+    writer = _GpxWriter() if export_format is ExportFormat.GPX else _GeoJsonWriter()
+    target = Path(filename)
+    path = target.with_name(f"{target.name}.part")
+    file = await hass.async_add_executor_job(_open, path)
+    try:
+        await hass.async_add_executor_job(file.write, writer.header(name))
+        count = await _async_write_points(hass, api, file, writer, start, end)
+        await hass.async_add_executor_job(file.write, writer.footer())
+    except BaseException:
+        await hass.async_add_executor_job(_finish, file, path, None)
+        raise
+    await hass.async_add_executor_job(_finish, file, path, target)
+    _LOGGER.info("Exported %s points to %s", count, filename)
+    return count
+
+
+async def _async_write_points(
+    hass: HomeAssistant,
+    api: DawarichClient,
+    file: TextIO,
+    writer: _GpxWriter | _GeoJsonWriter,
+    start: datetime,
+    end: datetime,
+) -> int:
+    """Write the points between start and end page by page."""
+    count = 0
+    page = 1
+    while True:
+        result = await api.get_points(start, end, page, EXPORT_PAGE_SIZE)
+        if result is None:
+            raise HomeAssistantError("Could not fetch the points from Dawarich")
+        if not result.points:
+            return count
+        await hass.async_add_executor_job(file.write, writer.points(result.points))
+        count += len(result.points)
+        _LOGGER.debug("Exported page %s of %s", page, result.total_pages)
+        # Without the number of pages a short page is the last one
+        if result.total_pages is None:
+            if len(result.points) < EXPORT_PAGE_SIZE:
+                return count
+        elif page >= result.total_pages:
+            return count
+        page += 1
@@ -0,0 +1,199 @@
+"""Rejection of GPS jitter and smoothing of location fixes."""
+
+import logging
+from collections.abc import Mapping
+from dataclasses import replace
+from math import cos, radians
+from typing import Any, Self
+
+from .const import (
+    CONF_MAX_ACCURACY,
+    CONF_MAX_SPEED,
+    CONF_SMOOTHING,
+    DEFAULT_MAX_ACCURACY,
+    DEFAULT_MAX_SPEED,
+    DEFAULT_SMOOTHING,
+    FILTER_ACCELERATION,
+    FILTER_MAX_REJECTED,
+    FILTER_RESET_INTERVAL,
+)
+from .helpers import EARTH_RADIUS_M, haversine_distance
+from .models import DawarichPoint
+
+_LOGGER = logging.getLogger(__name__)
+
+_METRES_PER_DEGREE = radians(1) * EARTH_RADIUS_M
+# Variance of the speed of a device whose speed is not known yet, in (m/s)²
+_INITIAL_SPEED_VARIANCE = 100.0
+
+
+class _KalmanAxis:
+    """Constant velocity Kalman filter of a single axis, in metres."""
+
+    __slots__ = ("p00", "p01", "p11", "position", "velocity")
+
+    def __init__(self, position: float, variance: float) -> None:
+        """Start at position, with the variance of the measurement."""
+        self.position = position
+        self.velocity = 0.0
+        self.p00 = variance
+        self.p01 = 0.0
+        self.p11 = _INITIAL_SPEED_VARIANCE
+
+    def update(self, position: float, variance: float, elapsed: float) -> float:
+        """Add a measurement taken elapsed seconds later, return the estimate."""
+        # Predict, with a random acceleration of FILTER_ACCELERATION m/s²
+        noise = FILTER_ACCELERATION**2
+        self.position += self.velocity * elapsed
+        self.p00 += elapsed * (2 * self.p01 + elapsed * self.p11) + (
+            noise * elapsed**4 / 4
+        )
+        self.p01 += elapsed * self.p11 + noise * elapsed**3 / 2
+        self.p11 += noise * elapsed**2
+
+        # Correct, weighing the measurement by its reported accuracy
+        gain_position = self.p00 / (self.p00 + variance)
+        gain_velocity = self.p01 / (self.p00 + variance)
+        error = position - self.position
+        self.position += gain_position * error
+        self.velocity += gain_velocity * error
+        self.p11 -= gain_velocity * self.p01
+        self.p00 *= 1 - gain_position
+        self.p01 *= 1 - gain_position
+        return self.position
+
+
+class DawarichPointFilter:
+    """Clean up the fixes of a single device before anything else sees them.
+
+    Fixes with a GPS accuracy worse than ``max_accuracy`` metres are
+    rejected, as are fixes further from the last accepted fix than the
+    device could have travelled at ``max_speed`` km/h. The reported accuracy
+    of both fixes is allowed for, and after ``FILTER_MAX_REJECTED`` jumps in a
+    row the device is assumed to have really moved. With ``smoothing`` the
+    accepted fixes run through a constant velocity Kalman filter weighted by
+    their ``horizontal_accuracy``, and by their ``vertical_accuracy`` for the
+    altitude. Fixes without an accuracy, or more than
+    ``FILTER_RESET_INTERVAL`` after the previous one, restart the filter.
+    """
+
+    def __init__(
+        self,
+        max_accuracy: float = 0,
+        max_speed: float = 0,
+        smoothing: bool = False,
+    ) -> None:
+        """Initialize the filter, a value of 0 disables the check."""
+        self._max_accuracy = max_accuracy
+        self._max_speed = max_speed / 3.6
+        self._smoothing = smoothing
+        self._last: DawarichPoint | None = None
+        self._rejected = 0
+        self._origin: tuple[float, float] = (0.0, 0.0)
+        self._latitude: _KalmanAxis | None = None
+        self._longitude: _KalmanAxis | None = None
+        self._altitude: _KalmanAxis | None = None
+
+    @classmethod
+    def from_options(cls, options: Mapping[str, Any]) -> Self:
+        """Create a filter from the options of a config entry."""
+        return cls(
+            max_accuracy=options.get(CONF_MAX_ACCURACY, DEFAULT_MAX_ACCURACY),
+            max_speed=options.get(CONF_MAX_SPEED, DEFAULT_MAX_SPEED),
+            smoothing=options.get(CONF_SMOOTHING, DEFAULT_SMOOTHING),
+        )
+
+    def process(self, point: DawarichPoint) -> DawarichPoint | None:
+        """Return the point to use instead of point, None to reject it."""
+        accuracy = point.horizontal_accuracy
+        if (
+            self._max_accuracy
+            and accuracy is not None
+            and accuracy > self._max_accuracy
+        ):
+            _LOGGER.debug("Rejecting location with an accuracy of %s m", accuracy)
+            return None
+
+        if (last := self._last) is None:
+            self._last = point
+            return self._smooth(point, None)
+        if point.timestamp <= last.timestamp:
+            # Out of order fixes are left to the uploader
+            return point
+
+        elapsed: float | None = (point.timestamp - last.timestamp).total_seconds()
+        if self._max_speed and self._is_jump(last, point, elapsed):
+            self._rejected += 1
+            if self._rejected < FILTER_MAX_REJECTED:
+                _LOGGER.debug("Rejecting location that is too far from the last one")
+                return None
+            # The device really moved, smooth from here on
+            _LOGGER.debug("Accepting location after %s jumps", self._rejected)
+            elapsed = None
+        self._rejected = 0
+        self._last = point
+        return self._smooth(point, elapsed)
+
+    def _is_jump(
+        self, last: DawarichPoint, point: DawarichPoint, elapsed: float
+    ) -> bool:
+        """Return True if point is further from last than the device can travel."""
+        distance = haversine_distance(
+            last.latitude, last.longitude, point.latitude, point.longitude
+        )
+        margin = (last.horizontal_accuracy or 0) + (point.horizontal_accuracy or 0)
+        return distance - margin > self._max_speed * elapsed
+
+    def _smooth(self, point: DawarichPoint, elapsed: float | None) -> DawarichPoint:
+        """Run point through the Kalman filter, elapsed None restarts it."""
+        if not self._smoothing:
+            return point
+        accuracy = point.horizontal_accuracy
+        if (
+            elapsed is None
+            or accuracy is None
+            or self._latitude is None
+            or self._longitude is None
+            or elapsed > FILTER_RESET_INTERVAL.total_seconds()
+        ):
+            self._origin = (point.latitude, point.longitude)
+            self._latitude = self._longitude = None
+            if accuracy is not None:
+                self._latitude = _KalmanAxis(0, accuracy**2)
+                self._longitude = _KalmanAxis(0, accuracy**2)
+            self._altitude = self._start_altitude(point)
+            return point
+
+        # Smooth in metres from the first location of the filter
+        latitude, longitude = self._origin
+        scale = _METRES_PER_DEGREE * cos(radians(latitude))
+        north = self._latitude.update(
+            (point.latitude - latitude) * _METRES_PER_DEGREE, accuracy**2, elapsed
+        )
+        east = self._longitude.update(
+            (point.longitude - longitude) * scale, accuracy**2, elapsed
+        )
+        altitude = point.altitude
+        if (
+            self._altitude is not None
+            and altitude is not None
+            and point.vertical_accuracy is not None
+        ):
+            altitude = self._altitude.update(
+                altitude, point.vertical_accuracy**2, elapsed
+            )
+        else:
+            self._altitude = self._start_altitude(point)
+        return replace(
+            point,
+            latitude=latitude + north / _METRES_PER_DEGREE,
+            longitude=longitude + east / scale,
+            altitude=altitude,
+        )
+
+    @staticmethod
+    def _start_altitude(point: DawarichPoint) -> _KalmanAxis | None:
+        """Return a filter for the altitude of point, if it can be smoothed."""
+        if point.altitude is None or point.vertical_accuracy is None:
+            return None
+        return _KalmanAxis(point.altitude, point.vertical_accuracy**2)
@@ -1,13 +1,136 @@
 """Helper functions for the Dawarich integration."""
 
-from dawarich_api import DawarichAPI
+import asyncio
+from collections.abc import Mapping
+from datetime import datetime
+from math import asin, cos, radians, sin, sqrt
+from typing import Any
 
+import aiohttp
+from homeassistant.core import HomeAssistant, State, split_entity_id
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-def get_api(host: str, api_key: str, use_ssl: bool, verify_ssl: bool) -> DawarichAPI:
-    """Get the API object."""
+from .api import DawarichClient
+from .const import DATA_CONNECTION_LIMITS, DEFAULT_MAX_CONNECTIONS, DEFAULT_TIMEOUT
+from .models import DawarichPoint
+
+EARTH_RADIUS_M = 6371008.8
+
+
+def get_api(
+    hass: HomeAssistant,
+    host: str,
+    api_key: str,
+    use_ssl: bool,
+    verify_ssl: bool,
+    *,
+    max_connections: int | None = None,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> DawarichClient:
+    """Get the API object.
+
+    All clients share Home Assistant's client session. Clients for the same
+    host created with the same max_connections share that limit on the
+    number of concurrent requests, while a client created without one, like
+    the one of the config flow, gets a limit of its own.
+    """
     url = host.removeprefix("http://").removeprefix("https://")
     if use_ssl:
         url = f"https://{url}"
     else:
         url = f"http://{url}"
-    return DawarichAPI(url=url, api_key=api_key, verify_ssl=verify_ssl)
+    if max_connections is None:
+        limit = asyncio.Semaphore(DEFAULT_MAX_CONNECTIONS)
+    else:
+        limits: dict[tuple[str, int], asyncio.Semaphore] = hass.data.setdefault(
+            DATA_CONNECTION_LIMITS, {}
+        )
+        if (limit := limits.get((url, max_connections))) is None:
+            limit = limits[url, max_connections] = asyncio.Semaphore(max_connections)
+    return DawarichClient(
+        url=url,
+        api_key=api_key,
+        session=async_get_clientsession(hass, verify_ssl),
+        limit=limit,
+        timeout=aiohttp.ClientTimeout(total=timeout),
+        verify_ssl=verify_ssl,
+    )
+
+
+def is_rejected_request(response_code: int) -> bool:
+    """Return whether Dawarich rejected a request that would fail again."""
+    # Timeouts and rate limits are worth retrying
+    return 400 <= response_code < 500 and response_code not in (408, 429)
+
+
+def is_auth_error(response_code: int, error: str | None) -> bool:
+    """Return whether a Dawarich response means the API key was rejected."""
+    if response_code == 401:
+        return True
+    # Some servers return 500 but include 401/Unauthorized in the error
+    error_str = str(error) if error else ""
+    return "401" in error_str or "unauthorized" in error_str
+
+
+def get_tracker_name(entry_name: str, entity_id: str, tracker_count: int) -> str:
+    """Get the name a tracked device is known by in Dawarich.
+
+    An entry that tracks a single device keeps using the entry name, so points
+    keep ending up on the same Dawarich device as before.
+    """
+    if tracker_count == 1:
+        return entry_name
+    return f"{entry_name} {split_entity_id(entity_id)[1]}"
+
+
+def point_from_state(state: State) -> DawarichPoint | None:
+    """Build a point from a device tracker state, None if it has no coordinates."""
+    return point_from_attributes(state.attributes, state.last_updated)
+
+
+def point_from_attributes(
+    attributes: Mapping[str, Any], timestamp: datetime
+) -> DawarichPoint | None:
+    """Build a point from device tracker attributes, None without coordinates."""
+    latitude = attributes.get("latitude")
+    longitude = attributes.get("longitude")
+    if latitude is None or longitude is None:
+        return None
+
+    # Only include optional parameters if they have valid values
+    optional_params = {}
+
+    if (gps_accuracy := attributes.get("gps_accuracy")) is not None:
+        optional_params["horizontal_accuracy"] = gps_accuracy
+
+    if (altitude := attributes.get("altitude")) is not None:
+        optional_params["altitude"] = altitude
+
+    if (vertical_accuracy := attributes.get("vertical_accuracy")) is not None:
+        optional_params["vertical_accuracy"] = vertical_accuracy
+
+    if (speed := attributes.get("speed")) is not None:
+        optional_params["speed"] = speed
+    elif (velocity := attributes.get("velocity")) is not None:
+        optional_params["speed"] = velocity
+
+    if (battery := attributes.get("battery")) is not None:
+        optional_params["battery"] = battery
+
+    return DawarichPoint(
+        latitude=latitude,
+        longitude=longitude,
+        timestamp=timestamp,
+        **optional_params,
+    )
+
+
+def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Return the great-circle distance between two coordinates in metres."""
+    d_lat = radians(lat2 - lat1)
+    d_lon = radians(lon2 - lon1)
+    a = (
+        sin(d_lat / 2) ** 2
+        + cos(radians(lat1)) * cos(radians(lat2)) * sin(d_lon / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * asin(sqrt(a))
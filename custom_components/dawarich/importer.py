@@ -0,0 +1,172 @@
+"""Import of recorder history into Dawarich."""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.components.recorder import get_instance, history
+from homeassistant.core import HomeAssistant, State
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .api import DawarichClient
+from .const import (
+    DOMAIN,
+    EVENT_IMPORT_PROGRESS,
+    IMPORT_BATCH_SIZE,
+    IMPORT_STORAGE_VERSION,
+    IMPORT_WINDOW,
+)
+from .helpers import point_from_state
+from .models import DawarichPoint
+from .thinning import DawarichPointThinner
+
+_LOGGER = logging.getLogger(__name__)
+
+# The recorder only returns states after the start and before the end of a
+# period, so periods end just after the window to include states on the edge.
+_WINDOW_OVERLAP = timedelta(microseconds=1)
+
+type ImportCheckpoints = dict[str, dict[str, dict[str, str]]]
+
+
+def _get_store(hass: HomeAssistant, entry_id: str) -> Store[ImportCheckpoints]:
+    """Return the store of the import checkpoints of an entry."""
+    return Store(hass, IMPORT_STORAGE_VERSION, f"{DOMAIN}.import.{entry_id}")
+
+
+async def async_remove_checkpoints(hass: HomeAssistant, entry_id: str) -> None:
+    """Remove the import checkpoints of an entry from disk."""
+    await _get_store(hass, entry_id).async_remove()
+
+
+class DawarichHistoryImporter:
+    """Stream the recorder history of a device tracker to Dawarich.
+
+    The history is read one ``IMPORT_WINDOW`` at a time and sent in batches
+    of up to ``IMPORT_BATCH_SIZE`` points, so memory use does not depend on
+    the length of the imported period. After every batch the position is
+    stored as a checkpoint, and importing the same period again continues
+    from there. An import without an end runs up to now, and calling it
+    again with the same start continues from the checkpoint up to the new
+    now.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, api: DawarichClient) -> None:
+        """Initialize the importer."""
+        self._hass = hass
+        self._api = api
+        self._store = _get_store(hass, entry_id)
+        self._lock = asyncio.Lock()
+
+    async def async_import(
+        self,
+        entity_id: str,
+        device_name: str,
+        start: datetime,
+        end: datetime | None,
+        thinner: DawarichPointThinner,
+        *,
+        restart: bool = False,
+    ) -> dict[str, Any]:
+        """Import the history of entity_id between start and end, or now."""
+        open_end = end is None
+        if end is None:
+            end = dt_util.utcnow()
+        if self._lock.locked():
+            raise HomeAssistantError("A history import is already running")
+        async with self._lock:
+            data = await self._store.async_load() or {"imports": {}}
+            checkpoints = data["imports"]
+            position = start
+            checkpoint = checkpoints.get(entity_id)
+            if (
+                not restart
+                and checkpoint is not None
+                and checkpoint["start"] == start.isoformat()
+                and (open_end or checkpoint["end"] == end.isoformat())
+            ):
+                position = datetime.fromisoformat(checkpoint["position"])
+                _LOGGER.info("Resuming history import of %s at %s", entity_id, position)
+
+            states = 0
+            sent = 0
+            batch: list[DawarichPoint] = []
+            while position < end:
+                window_end = min(position + IMPORT_WINDOW, end)
+                for state in await get_instance(self._hass).async_add_executor_job(
+                    self._get_states, entity_id, position, window_end
+                ):
+                    states += 1
+                    point = point_from_state(state)
+                    if point is not None and thinner.accept(point):
+                        batch.append(point)
+                    if len(batch) >= IMPORT_BATCH_SIZE:
+                        sent += await self._async_send(batch, device_name)
+                        batch = []
+                        position = state.last_updated
+                        await self._async_checkpoint(
+                            data, entity_id, start, end, position, sent
+                        )
+
+                if window_end == end and batch:
+                    sent += await self._async_send(batch, device_name)
+                    batch = []
+                if not batch:
+                    await self._async_checkpoint(
+                        data, entity_id, start, end, window_end, sent
+                    )
+                position = window_end
+
+            checkpoints.pop(entity_id, None)
+            await self._store.async_save(data)
+
+        _LOGGER.info("Imported %s points from %s states of %s", sent, states, entity_id)
+        return {"states": states, "points": sent}
+
+    def _get_states(
+        self, entity_id: str, start: datetime, end: datetime
+    ) -> list[State]:
+        """Read the states of entity_id after start up to and including end."""
+        return history.get_significant_states(
+            self._hass,
+            start,
+            end + _WINDOW_OVERLAP,
+            [entity_id],
+            include_start_time_state=False,
+            significant_changes_only=False,
+        ).get(entity_id, [])  # type: ignore[return-value]
+
+    async def _async_send(self, points: list[DawarichPoint], device_name: str) -> int:
+        """Send a batch of points, raise if Dawarich does not accept them."""
+        response = await self._api.add_points(points, device_name)
+        if not response.success:
+            raise HomeAssistantError(
+                f"Dawarich returned status {response.response_code} while importing "
+                f"history: {response.error}. Call the service again with the same "
+                "period to continue the import"
+            )
+        return len(points)
+
+    async def _async_checkpoint(
+        self,
+        data: ImportCheckpoints,
+        entity_id: str,
+        start: datetime,
+        end: datetime,
+        position: datetime,
+        sent: int,
+    ) -> None:
+        """Store how far the import got and report the progress."""
+        data["imports"][entity_id] = {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "position": position.isoformat(),
+        }
+        await self._store.async_save(data)
+        self._hass.bus.async_fire(
+            EVENT_IMPORT_PROGRESS,
+            {"entity_id": entity_id, "position": position.isoformat(), "points": sent},
+        )
@@ -0,0 +1,38 @@
+"""Data models for the Dawarich integration."""
+
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Self
+
+
+@dataclass(slots=True)
+class DawarichPoint:
+    """A single location fix that should be sent to Dawarich."""
+
+    latitude: float
+    longitude: float
+    timestamp: datetime
+    altitude: float | None = None
+    speed: float | None = None
+    horizontal_accuracy: float | None = None
+    vertical_accuracy: float | None = None
+    battery: int | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON serializable representation of the point."""
+        data = asdict(self)
+        data["timestamp"] = self.timestamp.isoformat()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Self:
+        """Create a point from the output of as_dict."""
+        return cls(**{**data, "timestamp": datetime.fromisoformat(data["timestamp"])})
+
+
+@dataclass(slots=True)
+class DawarichPointsPage:
+    """A page of points fetched from Dawarich."""
+
+    points: list[DawarichPoint]
+    total_pages: int | None
@@ -0,0 +1,152 @@
+"""Persistent outbox of points that have not yet been accepted by Dawarich."""
+
+import logging
+from pathlib import Path
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import STORAGE_DIR, Store
+
+from .const import (
+    DOMAIN,
+    OUTBOX_MAX_POINTS,
+    OUTBOX_SAVE_DELAY,
+    OUTBOX_STORAGE_VERSION,
+)
+from .models import DawarichPoint
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class DawarichOutbox:
+    """Ordered, bounded queue of unsent points backed by a Home Assistant store.
+
+    Points are appended in memory and written to disk with a short delay, so a
+    burst of points results in a single write of the compacted queue. When the
+    queue is full the oldest points are evicted first. Every point is kept
+    serialized next to the point itself, so a write only copies a list on the
+    event loop and Home Assistant encodes it in the executor.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, key: str, max_points: int = OUTBOX_MAX_POINTS
+    ) -> None:
+        """Initialize the outbox."""
+        self._store: Store[dict[str, list[dict[str, Any]]]] = Store(
+            hass, OUTBOX_STORAGE_VERSION, f"{DOMAIN}.outbox.{key}"
+        )
+        self._max_points = max_points
+        self._points: list[DawarichPoint] = []
+        self._rows: list[dict[str, Any]] = []
+        self._evicting = False
+        self._save_scheduled = False
+
+    def __len__(self) -> int:
+        """Return the number of unsent points."""
+        return len(self._points)
+
+    async def async_load(self) -> None:
+        """Load unsent points left over from a previous run."""
+        if (data := await self._store.async_load()) is None:
+            return
+        self._rows = data["points"]
+        self._points = [DawarichPoint.from_dict(row) for row in self._rows]
+        if self._points:
+            _LOGGER.info(
+                "Loaded %s unsent points from the Dawarich outbox", len(self._points)
+            )
+
+    @callback
+    def async_append(self, point: DawarichPoint) -> int:
+        """Add a point to the end of the outbox, return the number of evicted points."""
+        self._points.append(point)
+        self._rows.append(point.as_dict())
+        excess = max(len(self._points) - self._max_points, 0)
+        if excess:
+            if not self._evicting:
+                _LOGGER.warning(
+                    "Dawarich outbox is full (%s points), dropping the oldest unsent points",
+                    self._max_points,
+                )
+                self._evicting = True
+            del self._points[:excess]
+            del self._rows[:excess]
+        self._async_schedule_save()
+        return excess
+
+    @property
+    def last(self) -> DawarichPoint | None:
+        """Return the newest point, if any."""
+        return self._points[-1] if self._points else None
+
+    @callback
+    def async_replace_last(self, point: DawarichPoint) -> None:
+        """Replace the newest point with point."""
+        self._points[-1] = point
+        self._rows[-1] = point.as_dict()
+        self._async_schedule_save()
+
+    def peek(self, count: int) -> list[DawarichPoint]:
+        """Return up to count of the oldest points without removing them."""
+        return self._points[:count]
+
+    @callback
+    def async_ack(self, points: list[DawarichPoint]) -> None:
+        """Remove points returned by peek once Dawarich has accepted them."""
+        if not points:
+            return
+        # Some of the points may have been evicted while they were uploaded,
+        # so drop everything up to and including the last acknowledged point.
+        last = points[-1]
+        for index, point in enumerate(self._points[: len(points)]):
+            if point is last:
+                del self._points[: index + 1]
+                del self._rows[: index + 1]
+                break
+        self._evicting = False
+        self._async_schedule_save()
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Write the outbox to disk after a short delay."""
+        # Store postpones a pending write on every call, which would keep a
+        # busy outbox from ever being written, so only schedule one at a time.
+        if not self._save_scheduled:
+            self._save_scheduled = True
+            self._store.async_delay_save(self._data_to_save, OUTBOX_SAVE_DELAY)
+
+    def _data_to_save(self) -> dict[str, list[dict[str, Any]]]:
+        """Return the data to store, Store may call this in the executor."""
+        self._save_scheduled = False
+        # The rows are never changed once added, a copy of the list is enough
+        return {"points": list(self._rows)}
+
+    async def async_save(self) -> None:
+        """Write the outbox to disk immediately."""
+        await self._store.async_save(self._data_to_save())
+
+    async def async_remove(self) -> None:
+        """Remove the outbox from disk."""
+        self._points = []
+        self._rows = []
+        await self._store.async_remove()
+
+
+async def async_list_outboxes(hass: HomeAssistant, prefix: str) -> list[str]:
+    """Return the keys of the stored outboxes whose key starts with prefix."""
+    storage_prefix = f"{DOMAIN}.outbox."
+
+    def list_keys() -> list[str]:
+        try:
+            names = [
+                path.name for path in Path(hass.config.path(STORAGE_DIR)).iterdir()
+            ]
+        except FileNotFoundError:
+            return []
+        return [
+            name.removeprefix(storage_prefix)
+            for name in names
+            if name.startswith(storage_prefix + prefix)
+        ]
+
+    return await hass.async_add_executor_job(list_keys)
@@ -0,0 +1,86 @@
+"""Recent locations of a tracked device, kept in a fixed amount of memory."""
+
+from array import array
+from datetime import UTC, datetime
+from math import isnan, nan
+
+from .const import RECENT_POINTS_SIZE
+from .models import DawarichPoint
+
+
+def _optional(value: float) -> float | None:
+    """Return a stored float, None for the NaN stored for unknown."""
+    return None if isnan(value) else value
+
+
+class DawarichRecentPoints:
+    """Ring buffer of the last locations of a device.
+
+    Every field is kept in its own preallocated array, so a buffer of
+    ``size`` locations takes 41 bytes per location no matter how many
+    locations were added. Unknown accuracies and speeds are stored as NaN
+    and an unknown battery level as -1.
+    """
+
+    __slots__ = (
+        "_accuracy",
+        "_battery",
+        "_count",
+        "_latitude",
+        "_longitude",
+        "_next",
+        "_speed",
+        "_timestamp",
+        "size",
+    )
+
+    def __init__(self, size: int = RECENT_POINTS_SIZE) -> None:
+        """Initialize an empty buffer."""
+        self.size = size
+        self._latitude = array("d", bytes(8 * size))
+        self._longitude = array("d", bytes(8 * size))
+        self._timestamp = array("d", bytes(8 * size))
+        self._accuracy = array("d", bytes(8 * size))
+        self._speed = array("d", bytes(8 * size))
+        self._battery = array("b", bytes(size))
+        self._next = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        """Return the number of locations in the buffer."""
+        return self._count
+
+    def append(self, point: DawarichPoint) -> None:
+        """Add a location, replacing the oldest one when the buffer is full."""
+        index = self._next
+        self._latitude[index] = point.latitude
+        self._longitude[index] = point.longitude
+        self._timestamp[index] = point.timestamp.timestamp()
+        self._accuracy[index] = (
+            nan if point.horizontal_accuracy is None else point.horizontal_accuracy
+        )
+        self._speed[index] = nan if point.speed is None else point.speed
+        self._battery[index] = (
+            -1 if point.battery is None else max(0, min(100, round(point.battery)))
+        )
+        self._next = (index + 1) % self.size
+        self._count = min(self._count + 1, self.size)
+
+    def points(self, limit: int | None = None) -> list[DawarichPoint]:
+        """Return the last limit locations, or all of them, oldest first."""
+        count = self._count if limit is None else min(limit, self._count)
+        points = []
+        for offset in range(count, 0, -1):
+            index = (self._next - offset) % self.size
+            battery = self._battery[index]
+            points.append(
+                DawarichPoint(
+                    latitude=self._latitude[index],
+                    longitude=self._longitude[index],
+                    timestamp=datetime.fromtimestamp(self._timestamp[index], UTC),
+                    horizontal_accuracy=_optional(self._accuracy[index]),
+                    speed=_optional(self._speed[index]),
+                    battery=None if battery < 0 else battery,
+                )
+            )
+        return points
@@ -0,0 +1,125 @@
+"""Coordinators shared by the config entries of the same Dawarich server."""
+
+import asyncio
+import logging
+import random
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from homeassistant.core import HomeAssistant, callback
+
+from .api import DawarichClient
+from .const import DATA_COORDINATORS, STATS_REFRESH_JITTER
+from .coordinator import (
+    DawarichAreasCoordinator,
+    DawarichCoordinator,
+    DawarichStatsCoordinator,
+    DawarichVersionCoordinator,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class DawarichSharedCoordinator[CoordinatorT: DawarichCoordinator]:
+    """A coordinator and the config entries using it.
+
+    Entries hold ``lock`` while giving the coordinator its first data, so an
+    entry set up at the same time as another waits for that data instead of
+    fetching it again.
+    """
+
+    coordinator: CoordinatorT
+    entry_ids: set[str] = field(default_factory=set)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+class DawarichCoordinatorRegistry:
+    """Share coordinators between config entries.
+
+    Entries with the same server and API key share a stats and an areas
+    coordinator, and entries with the same server share a version
+    coordinator. A coordinator
+    is created by the first entry that needs it, so that entry's options
+    decide its update intervals, and it is shut down once the last entry
+    using it is unloaded. Stats coordinators of other users on a server that
+    is already polled get a random refresh delay of up to
+    ``STATS_REFRESH_JITTER``.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the registry."""
+        self._stats: dict[
+            tuple[str, str], DawarichSharedCoordinator[DawarichStatsCoordinator]
+        ] = {}
+        self._versions: dict[
+            str, DawarichSharedCoordinator[DawarichVersionCoordinator]
+        ] = {}
+        self._areas: dict[
+            tuple[str, str], DawarichSharedCoordinator[DawarichAreasCoordinator]
+        ] = {}
+
+    @callback
+    def async_acquire_stats(
+        self,
+        entry_id: str,
+        api: DawarichClient,
+        factory: Callable[[], DawarichStatsCoordinator],
+    ) -> DawarichSharedCoordinator[DawarichStatsCoordinator]:
+        """Return the stats coordinator of the user of api for entry_id."""
+        key = (api.url, api.api_key)
+        if (shared := self._stats.get(key)) is None:
+            coordinator = factory()
+            if any(url == api.url for url, _ in self._stats):
+                coordinator.refresh_delay = random.uniform(
+                    0, STATS_REFRESH_JITTER.total_seconds()
+                )
+            shared = self._stats[key] = DawarichSharedCoordinator(coordinator)
+        shared.entry_ids.add(entry_id)
+        return shared
+
+    @callback
+    def async_acquire_version(
+        self,
+        entry_id: str,
+        api: DawarichClient,
+        factory: Callable[[], DawarichVersionCoordinator],
+    ) -> DawarichSharedCoordinator[DawarichVersionCoordinator]:
+        """Return the version coordinator of the server of api for entry_id."""
+        if (shared := self._versions.get(api.url)) is None:
+            shared = self._versions[api.url] = DawarichSharedCoordinator(factory())
+        shared.entry_ids.add(entry_id)
+        return shared
+
+    @callback
+    def async_acquire_areas(
+        self,
+        entry_id: str,
+        api: DawarichClient,
+        factory: Callable[[], DawarichAreasCoordinator],
+    ) -> DawarichSharedCoordinator[DawarichAreasCoordinator]:
+        """Return the areas coordinator of the user of api for entry_id."""
+        key = (api.url, api.api_key)
+        if (shared := self._areas.get(key)) is None:
+            shared = self._areas[key] = DawarichSharedCoordinator(factory())
+        shared.entry_ids.add(entry_id)
+        return shared
+
+    async def async_release(self, entry_id: str) -> None:
+        """Stop using the coordinators of entry_id, shut down unused ones."""
+        unused: list[DawarichCoordinator] = []
+        for registry in (self._stats, self._versions, self._areas):
+            for key, shared in list(registry.items()):
+                shared.entry_ids.discard(entry_id)
+                if not shared.entry_ids:
+                    del registry[key]  # type: ignore[arg-type]
+                    unused.append(shared.coordinator)
+        for coordinator in unused:
+            _LOGGER.debug("Shutting down unused coordinator %s", coordinator.name)
+            await coordinator.async_shutdown()
+
+
+@callback
+def get_coordinator_registry(hass: HomeAssistant) -> DawarichCoordinatorRegistry:
+    """Return the coordinator registry of Home Assistant."""
+    return hass.data.setdefault(DATA_COORDINATORS, DawarichCoordinatorRegistry())
@@ -1,31 +1,74 @@
 """Show statistical data from your Dawarich instance."""
 
 import logging
+from collections.abc import Callable
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Any, Self
 
-from dawarich_api import DawarichAPI
 from homeassistant.components.device_tracker.const import SourceType
-from homeassistant.components.sensor import SensorEntity, SensorEntityDescription
+from homeassistant.components.sensor import (
+    RestoreSensor,
+    SensorEntity,
+    SensorEntityDescription,
+)
 from homeassistant.components.sensor.const import SensorDeviceClass, SensorStateClass
 from homeassistant.const import (
     CONF_HOST,
     CONF_NAME,
+    EntityCategory,
     UnitOfLength,
+    UnitOfSpeed,
+    UnitOfTime,
+)
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    Event,
+    EventStateChangedData,
+    HomeAssistant,
+    callback,
 )
-from homeassistant.core import HomeAssistant
 from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.helpers.event import (
+    async_track_device_registry_updated_event,
+    async_track_entity_registry_updated_event,
+    async_track_time_change,
+)
+from homeassistant.helpers.restore_state import ExtraStoredData, RestoreEntity
 from homeassistant.helpers.typing import StateType
 from homeassistant.helpers.update_coordinator import (
     CoordinatorEntity,
 )
+from homeassistant.util import dt as dt_util
 
 from custom_components.dawarich import DawarichConfigEntry
 
-from .const import CONF_DEVICE, DOMAIN, DawarichTrackerStates
-from .coordinator import DawarichStatsCoordinator, DawarichVersionCoordinator
+from .areas import DawarichArea
+from .const import (
+    CONF_COALESCE_BATTERY,
+    DEFAULT_COALESCE_BATTERY,
+    DOMAIN,
+    SIGNAL_WEBHOOK_UPLOADER,
+    DawarichTrackerStates,
+)
+from .coordinator import (
+    DawarichAreasCoordinator,
+    DawarichStatsCoordinator,
+    DawarichVersionCoordinator,
+)
+from .counters import DawarichCounterPeriod, DawarichDistanceCounter
+from .filtering import DawarichPointFilter
+from .helpers import point_from_state
+from .models import DawarichPoint
+from .recent import DawarichRecentPoints
+from .thinning import DawarichPointThinner
+from .tracker import DawarichTrackerListener
+from .trips import DawarichTripSegmenter
+from .uploader import DawarichPointUploader, DawarichQueueResult
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -36,32 +79,77 @@ SENSOR_TYPES = (
         name="Total Distance",
         icon="mdi:map-marker-distance",
         device_class=SensorDeviceClass.DISTANCE,
+        state_class=SensorStateClass.TOTAL,
         translation_key="total_distance",
     ),
     SensorEntityDescription(
         key="total_points_tracked",
         name="Total Points Tracked",
         icon="mdi:map-marker-multiple",
+        state_class=SensorStateClass.TOTAL,
         translation_key="total_points_tracked",
     ),
     SensorEntityDescription(
         key="total_reverse_geocoded_points",
         name="Total Reverse Geocoded Points",
         icon="mdi:map-marker-question",
+        state_class=SensorStateClass.TOTAL,
         translation_key="total_reverse_geocoded_points",
     ),
     SensorEntityDescription(
         key="total_countries_visited",
         name="Total Countries Visited",
         icon="mdi:earth",
+        state_class=SensorStateClass.TOTAL,
         translation_key="total_countries_visited",
     ),
     SensorEntityDescription(
         key="total_cities_visited",
         name="Total Cities Visited",
         icon="mdi:city",
+        state_class=SensorStateClass.TOTAL,
         translation_key="total_cities_visited",
     ),
+    SensorEntityDescription(
+        key="current_month_distance_km",
+        native_unit_of_measurement=UnitOfLength.KILOMETERS,
+        name="Current Month Distance",
+        icon="mdi:calendar-month",
+        device_class=SensorDeviceClass.DISTANCE,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        translation_key="current_month_distance",
+    ),
+    SensorEntityDescription(
+        key="previous_month_distance_km",
+        native_unit_of_measurement=UnitOfLength.KILOMETERS,
+        name="Previous Month Distance",
+        icon="mdi:calendar-month-outline",
+        device_class=SensorDeviceClass.DISTANCE,
+        translation_key="previous_month_distance",
+    ),
+    SensorEntityDescription(
+        key="current_year_distance_km",
+        native_unit_of_measurement=UnitOfLength.KILOMETERS,
+        name="Current Year Distance",
+        icon="mdi:calendar-range",
+        device_class=SensorDeviceClass.DISTANCE,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        translation_key="current_year_distance",
+    ),
+    SensorEntityDescription(
+        key="current_year_countries_visited",
+        name="Current Year Countries Visited",
+        icon="mdi:earth",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        translation_key="current_year_countries_visited",
+    ),
+    SensorEntityDescription(
+        key="current_year_cities_visited",
+        name="Current Year Cities Visited",
+        icon="mdi:city",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        translation_key="current_year_cities_visited",
+    ),
 )
 
 TRACKER_SENSOR_TYPES = SensorEntityDescription(
@@ -77,8 +165,221 @@ VERSION_SENSOR_TYPES = SensorEntityDescription(
     translation_key="version",
 )
 
+
+@dataclass(frozen=True, kw_only=True)
+class DawarichUploadSensorEntityDescription(SensorEntityDescription):
+    """Describes a Dawarich upload diagnostic sensor."""
+
+    value_fn: Callable[[DawarichPointUploader], StateType]
+
+
+# Upload telemetry of a tracked device, disabled by default
+UPLOAD_SENSOR_TYPES = (
+    DawarichUploadSensorEntityDescription(
+        key="queued_points",
+        name="Queued Points",
+        icon="mdi:tray-full",
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda uploader: uploader.queued_points,
+    ),
+    DawarichUploadSensorEntityDescription(
+        key="points_sent",
+        name="Points Sent",
+        icon="mdi:upload",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda uploader: uploader.telemetry.points_sent,
+    ),
+    DawarichUploadSensorEntityDescription(
+        key="points_failed",
+        name="Points Failed",
+        icon="mdi:upload-off",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda uploader: uploader.telemetry.points_failed,
+    ),
+    DawarichUploadSensorEntityDescription(
+        key="points_dropped",
+        name="Points Dropped",
+        icon="mdi:delete-clock",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda uploader: uploader.telemetry.points_dropped,
+    ),
+    DawarichUploadSensorEntityDescription(
+        key="points_rejected",
+        name="Points Rejected",
+        icon="mdi:map-marker-remove",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda uploader: uploader.telemetry.points_rejected,
+    ),
+    DawarichUploadSensorEntityDescription(
+        key="upload_latency",
+        name="Upload Latency",
+        icon="mdi:timer-outline",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=2,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda uploader: uploader.telemetry.upload_latency.last,
+    ),
+    DawarichUploadSensorEntityDescription(
+        key="last_error_code",
+        name="Last Error Code",
+        icon="mdi:alert-circle-outline",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda uploader: uploader.telemetry.last_error_code,
+    ),
+)
+
+REFRESH_DURATION_SENSOR_TYPES = SensorEntityDescription(
+    key="stats_refresh_duration",
+    name="Stats Refresh Duration",
+    icon="mdi:timer-refresh-outline",
+    native_unit_of_measurement=UnitOfTime.SECONDS,
+    device_class=SensorDeviceClass.DURATION,
+    state_class=SensorStateClass.MEASUREMENT,
+    suggested_display_precision=2,
+    entity_category=EntityCategory.DIAGNOSTIC,
+    entity_registry_enabled_default=False,
+)
+
+AREA_SENSOR_TYPES = SensorEntityDescription(
+    key="area",
+    name="Area",
+    icon="mdi:map-marker-radius",
+    translation_key="area",
+)
+
+
+@dataclass(frozen=True, kw_only=True)
+class DawarichTripSensorEntityDescription(SensorEntityDescription):
+    """Describes a Dawarich trip sensor."""
+
+    value_fn: Callable[[DawarichTripSegmenter], StateType | datetime]
+
+
+# Current or last trip of a tracked device
+TRIP_SENSOR_TYPES = (
+    DawarichTripSensorEntityDescription(
+        key="trip_distance",
+        name="Trip Distance",
+        icon="mdi:map-marker-path",
+        native_unit_of_measurement=UnitOfLength.METERS,
+        suggested_unit_of_measurement=UnitOfLength.KILOMETERS,
+        suggested_display_precision=2,
+        device_class=SensorDeviceClass.DISTANCE,
+        translation_key="trip_distance",
+        value_fn=lambda segmenter: segmenter.trip_distance,
+    ),
+    DawarichTripSensorEntityDescription(
+        key="trip_duration",
+        name="Trip Duration",
+        icon="mdi:timer-outline",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        suggested_unit_of_measurement=UnitOfTime.MINUTES,
+        suggested_display_precision=0,
+        device_class=SensorDeviceClass.DURATION,
+        translation_key="trip_duration",
+        value_fn=lambda segmenter: segmenter.trip_duration,
+    ),
+    DawarichTripSensorEntityDescription(
+        key="trip_average_speed",
+        name="Trip Average Speed",
+        icon="mdi:speedometer",
+        native_unit_of_measurement=UnitOfSpeed.METERS_PER_SECOND,
+        suggested_unit_of_measurement=UnitOfSpeed.KILOMETERS_PER_HOUR,
+        suggested_display_precision=1,
+        device_class=SensorDeviceClass.SPEED,
+        translation_key="trip_average_speed",
+        value_fn=lambda segmenter: segmenter.trip_average_speed,
+    ),
+    DawarichTripSensorEntityDescription(
+        key="stationary_since",
+        name="Stationary Since",
+        icon="mdi:map-marker-check",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        translation_key="stationary_since",
+        value_fn=lambda segmenter: segmenter.stationary_since,
+    ),
+)
+
+
+@dataclass(frozen=True, kw_only=True)
+class DawarichCounterSensorEntityDescription(SensorEntityDescription):
+    """Describes a Dawarich distance or points counter sensor."""
+
+    period: DawarichCounterPeriod
+    value_key: str
+
+
+# Distance and points sent for a tracked device, counted in Home Assistant
+COUNTER_SENSOR_TYPES = (
+    DawarichCounterSensorEntityDescription(
+        key="distance_today",
+        name="Distance Today",
+        icon="mdi:map-marker-distance",
+        native_unit_of_measurement=UnitOfLength.METERS,
+        suggested_unit_of_measurement=UnitOfLength.KILOMETERS,
+        suggested_display_precision=2,
+        device_class=SensorDeviceClass.DISTANCE,
+        state_class=SensorStateClass.TOTAL,
+        translation_key="distance_today",
+        period=DawarichCounterPeriod.DAY,
+        value_key="distance",
+    ),
+    DawarichCounterSensorEntityDescription(
+        key="distance_this_week",
+        name="Distance This Week",
+        icon="mdi:map-marker-distance",
+        native_unit_of_measurement=UnitOfLength.METERS,
+        suggested_unit_of_measurement=UnitOfLength.KILOMETERS,
+        suggested_display_precision=2,
+        device_class=SensorDeviceClass.DISTANCE,
+        state_class=SensorStateClass.TOTAL,
+        translation_key="distance_this_week",
+        period=DawarichCounterPeriod.WEEK,
+        value_key="distance",
+    ),
+    DawarichCounterSensorEntityDescription(
+        key="points_today",
+        name="Points Today",
+        icon="mdi:map-marker-multiple",
+        state_class=SensorStateClass.TOTAL,
+        translation_key="points_today",
+        period=DawarichCounterPeriod.DAY,
+        value_key="points",
+    ),
+    DawarichCounterSensorEntityDescription(
+        key="points_this_week",
+        name="Points This Week",
+        icon="mdi:map-marker-multiple",
+        state_class=SensorStateClass.TOTAL,
+        translation_key="points_this_week",
+        period=DawarichCounterPeriod.WEEK,
+        value_key="points",
+    ),
+)
+
 type DawarichSensors = (
-    DawarichTrackerSensor | DawarichStatisticsSensor | DawarichVersionSensor
+    DawarichTrackerSensor
+    | DawarichAreaSensor
+    | DawarichTripSensor
+    | DawarichCounterSensor
+    | DawarichStatisticsSensor
+    | DawarichVersionSensor
+    | DawarichUploadSensor
+    | DawarichRefreshDurationSensor
 )
 
 
@@ -116,38 +417,195 @@ async def async_setup_entry(
             device_info=device_info,
         )
     )
+    sensors.append(
+        DawarichRefreshDurationSensor(
+            coordinator=coordinator,
+            description=REFRESH_DURATION_SENSOR_TYPES,
+            entry_id=entry_id,
+            device_name=name,
+            device_info=device_info,
+        )
+    )
 
-    # Add (optional) mobile app tracker sensor
-    mobile_app = entry.data[CONF_DEVICE]
-    if mobile_app is not None:
+    # Add (optional) mobile app tracker sensors, one per tracked device
+    uploaders = entry.runtime_data.uploaders
+    listener = DawarichTrackerListener(
+        hass,
+        list(uploaders),
+        entry.options.get(CONF_COALESCE_BATTERY, DEFAULT_COALESCE_BATTERY),
+    )
+    all_counters: list[DawarichDistanceCounter] = []
+    for mobile_app, uploader in uploaders.items():
         _LOGGER.info("Adding tracker sensor for %s", mobile_app)
-        api = entry.runtime_data.api
+        segmenter = DawarichTripSegmenter(hass)
+        entry.async_on_unload(segmenter.async_stop)
+        # Count from the last known location, which was sent before
+        last = None
+        if (state := hass.states.get(mobile_app)) is not None:
+            last = point_from_state(state)
+        counters = {
+            period: DawarichDistanceCounter(period, last)
+            for period in DawarichCounterPeriod
+        }
+        all_counters.extend(counters.values())
         sensors.append(
             DawarichTrackerSensor(
                 entry_id=entry_id,
-                device_name=name,
+                device_name=uploader.device_name,
                 mobile_app=mobile_app,
-                api=api,
+                uploader=uploader,
+                listener=listener,
+                point_filter=DawarichPointFilter.from_options(entry.options),
+                thinner=DawarichPointThinner.from_options(entry.options),
+                segmenter=segmenter,
+                counters=list(counters.values()),
+                recent_points=entry.runtime_data.recent_points[mobile_app],
                 hass=hass,
                 device_info=device_info,
                 description=TRACKER_SENSOR_TYPES,
             )
         )
+        sensors.extend(
+            DawarichUploadSensor(
+                entry_id=entry_id,
+                mobile_app=mobile_app,
+                uploader=uploader,
+                device_info=device_info,
+                description=description,
+            )
+            for description in UPLOAD_SENSOR_TYPES
+        )
+        sensors.extend(
+            DawarichTripSensor(
+                entry_id=entry_id,
+                device_name=uploader.device_name,
+                mobile_app=mobile_app,
+                segmenter=segmenter,
+                device_info=device_info,
+                description=description,
+            )
+            for description in TRIP_SENSOR_TYPES
+        )
+        sensors.extend(
+            DawarichCounterSensor(
+                entry_id=entry_id,
+                device_name=uploader.device_name,
+                mobile_app=mobile_app,
+                counter=counters[description.period],
+                device_info=device_info,
+                description=description,
+            )
+            for description in COUNTER_SENSOR_TYPES
+        )
+        if (areas_coordinator := entry.runtime_data.areas_coordinator) is not None:
+            sensors.append(
+                DawarichAreaSensor(
+                    coordinator=areas_coordinator,
+                    entry_id=entry_id,
+                    device_name=uploader.device_name,
+                    mobile_app=mobile_app,
+                    listener=listener,
+                    device_info=device_info,
+                    description=AREA_SENSOR_TYPES,
+                )
+            )
+    if uploaders:
+        entry.async_on_unload(listener.async_start())
+
+        @callback
+        def _async_roll_counters(now: datetime) -> None:
+            """Start the counters again at midnight."""
+            for counter in all_counters:
+                counter.async_roll(now)
+
+        entry.async_on_unload(
+            async_track_time_change(
+                hass, _async_roll_counters, hour=0, minute=0, second=0
+            )
+        )
     else:
         _LOGGER.info("No mobile device provided, skipping tracker sensor")
 
+    webhook_uploaders = entry.runtime_data.webhook_uploaders
+
+    def webhook_upload_sensors(key: str) -> list[DawarichUploadSensor]:
+        """Return the upload sensors of a device posting to the webhook."""
+        return [
+            DawarichUploadSensor(
+                entry_id=entry_id,
+                mobile_app=key,
+                uploader=webhook_uploaders[key],
+                device_info=device_info,
+                description=description,
+            )
+            for description in UPLOAD_SENSOR_TYPES
+        ]
+
+    @callback
+    def _async_add_webhook_sensors(key: str) -> None:
+        """Add the sensors of a device that posted to the webhook."""
+        async_add_entities(webhook_upload_sensors(key))
+
+    for key in webhook_uploaders:
+        sensors.extend(webhook_upload_sensors(key))
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass,
+            SIGNAL_WEBHOOK_UPLOADER.format(entry_id),
+            _async_add_webhook_sensors,
+        )
+    )
+
     async_add_entities(sensors)
 
 
-class DawarichTrackerSensor(SensorEntity):
-    """Sensor that updates and keep track of the updates to the Dawarich API."""
+@dataclass(slots=True)
+class DawarichTrackerExtraStoredData(ExtraStoredData):
+    """The last location handled by a tracker sensor."""
+
+    last_point: DawarichPoint | None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a dict representation of the data."""
+        return {
+            "last_point": None if self.last_point is None else self.last_point.as_dict()
+        }
+
+    @classmethod
+    def from_dict(cls, restored: dict[str, Any]) -> Self | None:
+        """Initialize the data from a dict, None if it is invalid."""
+        try:
+            last_point = restored["last_point"]
+            return cls(
+                None if last_point is None else DawarichPoint.from_dict(last_point)
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+
+
+class DawarichTrackerSensor(SensorEntity, RestoreEntity):
+    """Sensor that updates and keep track of the updates to the Dawarich API.
+
+    The last location of the device and the last upload result survive a
+    restart, so the location the device tracker restores at startup is not
+    sent again. Locations that were not acknowledged yet are kept in the
+    outbox and replayed from there instead.
+    """
+
+    _attr_should_poll = False
 
     def __init__(
         self,
         entry_id: str,
         device_name: str,
         mobile_app: str,
-        api: DawarichAPI,
+        uploader: DawarichPointUploader,
+        listener: DawarichTrackerListener,
+        point_filter: DawarichPointFilter,
+        thinner: DawarichPointThinner,
+        segmenter: DawarichTripSegmenter,
+        counters: list[DawarichDistanceCounter],
+        recent_points: DawarichRecentPoints,
         hass: HomeAssistant,
         device_info: DeviceInfo,
         description: SensorEntityDescription,
@@ -157,23 +615,26 @@ class DawarichTrackerSensor(SensorEntity):
         self._mobile_app = mobile_app
         self._entry_id = entry_id
         self._hass = hass
-        self._api = api
+        self._uploader = uploader
+        self._listener = listener
+        self._filter = point_filter
+        self._thinner = thinner
+        self._segmenter = segmenter
+        self._counters = counters
+        self._recent_points = recent_points
+        self._is_disabled = False
+        self._unsub_device_updates: CALLBACK_TYPE | None = None
         self._attr_device_info = device_info
         self._attr_device_class = description.device_class
         self.entity_description = description
-
-        self._async_unsubscribe_state_changed = async_track_state_change_event(
-            hass=self._hass,
-            entity_ids=[self._mobile_app],
-            action=self._async_update_callback,
-        )
         self._state: DawarichTrackerStates = DawarichTrackerStates.UNKNOWN
+        self._last_point: DawarichPoint | None = None
         self._attr_options = [state.value for state in DawarichTrackerStates]
 
     @property
     def unique_id(self) -> str:  # type: ignore[override]
         """Return a unique id for the sensor."""
-        return f"{self._entry_id}/tracker"
+        return f"{self._entry_id}/tracker/{self._mobile_app}"
 
     @property
     def state(self) -> StateType:
@@ -185,9 +646,48 @@ class DawarichTrackerSensor(SensorEntity):
         """Return the icon to use in the frontend."""
         return "mdi:map-marker-circle"
 
-    async def _async_update_callback(self, event):
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to the tracked device and to upload results."""
+        await super().async_added_to_hass()
+        # Restore before the device tracker restores its own state
+        if (last_state := await self.async_get_last_state()) is not None:
+            try:
+                self._state = DawarichTrackerStates(last_state.state)
+            except ValueError:
+                self._state = DawarichTrackerStates.UNKNOWN
+        if (last_extra_data := await self.async_get_last_extra_data()) is not None and (
+            data := DawarichTrackerExtraStoredData.from_dict(last_extra_data.as_dict())
+        ) is not None:
+            self._last_point = data.last_point
+        self.async_on_remove(
+            self._listener.async_register(self._mobile_app, self._async_update_callback)
+        )
+        self.async_on_remove(
+            self._uploader.async_add_listener(self._async_handle_upload_result)
+        )
+
+        # Only look the device and entity up again when the registries change
+        self._async_update_is_disabled()
+        self.async_on_remove(
+            async_track_entity_registry_updated_event(
+                self._hass, self.entity_id, self._async_registry_updated_callback
+            )
+        )
+        self.async_on_remove(self._async_unsubscribe_device_updates)
+
+    @callback
+    def _async_handle_upload_result(self, success: bool) -> None:
+        """Update the tracker state after a batch was sent."""
+        if success:
+            self._state = DawarichTrackerStates.SUCCESS
+        else:
+            self._state = DawarichTrackerStates.ERROR
+        self.async_write_ha_state()
+
+    @callback
+    def _async_update_callback(self, event: Event[EventStateChangedData]) -> None:
         """Update the Dawarich API with the new location."""
-        if await self._async_check_is_disabled():
+        if self._is_disabled:
             return
 
         _LOGGER.debug(
@@ -197,16 +697,10 @@ class DawarichTrackerSensor(SensorEntity):
             _LOGGER.error("No new state found for %s", self._mobile_app)
             return
 
-        # Log received data
         new_data = new_state.attributes
-        _LOGGER.debug("Received data: %s", new_data)
-
-        # Get coordinates from new_data
-        latitude = new_data.get("latitude")
-        longitude = new_data.get("longitude")
 
         # Check if the coordinates are present
-        if latitude is None or longitude is None:
+        if (point := point_from_state(new_state)) is None:
             if new_data.get("source") != SourceType.GPS:
                 _LOGGER.warning(
                     (
@@ -220,50 +714,46 @@ class DawarichTrackerSensor(SensorEntity):
             _LOGGER.debug("Coordinates are not present, skipping update")
             return
 
-        optional_params = await self._async_add_optional_params(new_data)
-
-        # Send to Dawarich API
-        response = await self._api.add_one_point(
-            name=self._device_name,
-            latitude=latitude,
-            longitude=longitude,
-            **optional_params,
-        )
-        if response.success:
-            _LOGGER.debug("Location sent to Dawarich API")
-            self._state = DawarichTrackerStates.SUCCESS
-        else:
-            self._state = DawarichTrackerStates.ERROR
-            _LOGGER.error(
-                "Error sending location to Dawarich API response code %s and error: %s",
-                response.response_code,
-                response.error,
-            )
-
-    async def _async_add_optional_params(self, new_data: dict) -> dict:
-        # Only include optional parameters if they have valid values
-        optional_params = {}
+        # The first state after a restart repeats the last location
+        last = self._last_point
+        self._last_point = point
+        if (
+            event.data.get("old_state") is None
+            and last is not None
+            and replace(point, timestamp=last.timestamp) == last
+        ):
+            _LOGGER.debug("Location was handled before the restart, skipping update")
+            return
 
-        if (gps_accuracy := new_data.get("gps_accuracy")) is not None:
-            optional_params["horizontal_accuracy"] = gps_accuracy
+        if (point := self._filter.process(point)) is None:
+            self._uploader.telemetry.points_rejected += 1
+            return
 
-        if (altitude := new_data.get("altitude")) is not None:
-            optional_params["altitude"] = altitude
+        # Trips are followed on every location, also those that are thinned
+        self._segmenter.async_add_point(point)
+        self._recent_points.append(point)
 
-        if (vertical_accuracy := new_data.get("vertical_accuracy")) is not None:
-            optional_params["vertical_accuracy"] = vertical_accuracy
+        if not self._thinner.accept(point):
+            _LOGGER.debug("Location did not change enough, skipping update")
+            return
 
-        if (speed := new_data.get("speed")) is not None:
-            optional_params["speed"] = speed
-        elif (velocity := new_data.get("velocity")) is not None:
-            optional_params["speed"] = velocity
+        # Queue for the next batch sent to the Dawarich API
+        result = self._uploader.async_add_point(point)
+        if result is DawarichQueueResult.SKIPPED:
+            return
+        for counter in self._counters:
+            counter.async_add_point(
+                point, replaces_last=result is DawarichQueueResult.REPLACED
+            )
 
-        if (battery := new_data.get("battery")) is not None:
-            optional_params["battery"] = battery
-        return optional_params
+    @property
+    def extra_restore_state_data(self) -> DawarichTrackerExtraStoredData:
+        """Return the last location to restore after a restart."""
+        return DawarichTrackerExtraStoredData(self._last_point)
 
-    async def _async_check_is_disabled(self) -> bool:
-        """Check if the Dawarich tracker sensor is disabled."""
+    @callback
+    def _async_update_is_disabled(self) -> None:
+        """Refresh the cached disabled state of the Dawarich tracker sensor."""
         device_registry = dr.async_get(self._hass)
         entity_registry = er.async_get(self._hass)
 
@@ -286,7 +776,13 @@ class DawarichTrackerSensor(SensorEntity):
                 "Device not found in device registry. This should not typically "
                 "happen. Try restarting Home Assistant.",
             )
-            return False
+            self._is_disabled = False
+            return
+
+        if self._unsub_device_updates is None:
+            self._unsub_device_updates = async_track_device_registry_updated_event(
+                self._hass, device.id, self._async_registry_updated_callback
+            )
 
         # Look up entity
         if self.registry_entry is None:
@@ -305,21 +801,35 @@ class DawarichTrackerSensor(SensorEntity):
                 "Entity not found in entity registry. This should not typically "
                 "happen. Try restarting Home Assistant.",
             )
-            return False
+            self._is_disabled = False
+            return
 
         if device.disabled:
             _LOGGER.debug(
-                "State change detected for %s, however, Dawarich device is disabled, not updating.",
+                "Dawarich device is disabled, not sending updates for %s",
                 self._mobile_app,
             )
-            return True
-        if entity_entry.disabled:
+            self._is_disabled = True
+        elif entity_entry.disabled:
             _LOGGER.debug(
-                "State change detected for %s, however, Dawarich tracker sensor is disabled, not updating.",
+                "Dawarich tracker sensor is disabled, not sending updates for %s",
                 self._mobile_app,
             )
-            return True
-        return False
+            self._is_disabled = True
+        else:
+            self._is_disabled = False
+
+    @callback
+    def _async_registry_updated_callback(self, event: Event) -> None:
+        """Refresh the disabled state when our device or entity changes."""
+        self._async_update_is_disabled()
+
+    @callback
+    def _async_unsubscribe_device_updates(self) -> None:
+        """Stop listening for device registry updates."""
+        if self._unsub_device_updates is not None:
+            self._unsub_device_updates()
+            self._unsub_device_updates = None
 
     @property
     def name(self) -> str:  # type: ignore[override]
@@ -347,7 +857,7 @@ class DawarichStatisticsSensor(CoordinatorEntity, SensorEntity):  # type: ignore
         self.entity_description = description
         self._attr_unique_id = f"{entry_id}/{description.key}"
         self._attr_device_info = device_info
-        self._attr_state_class = SensorStateClass.TOTAL
+        self._last_written: tuple[StateType, bool] | None = None
 
     @property
     def native_value(self) -> StateType:  # type: ignore[override]
@@ -356,6 +866,15 @@ class DawarichStatisticsSensor(CoordinatorEntity, SensorEntity):  # type: ignore
             return None
         return self.coordinator.data[self.entity_description.key]
 
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only when the value of this sensor changed."""
+        current = (self.native_value, self.available)
+        if current == self._last_written:
+            return
+        self._last_written = current
+        super()._handle_coordinator_update()
+
     @property
     def icon(self) -> str:  # type: ignore[override]
         """Return the icon to use in the frontend."""
@@ -405,3 +924,257 @@ class DawarichVersionSensor(
     def icon(self) -> str:
         """Return the icon to use in the frontend."""
         return "mdi:information-outline"
+
+
+class DawarichUploadSensor(SensorEntity):
+    """Diagnostic sensor showing the upload telemetry of a tracked device."""
+
+    _attr_should_poll = False
+    entity_description: DawarichUploadSensorEntityDescription
+
+    def __init__(
+        self,
+        entry_id: str,
+        mobile_app: str,
+        uploader: DawarichPointUploader,
+        device_info: DeviceInfo,
+        description: DawarichUploadSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        self._uploader = uploader
+        self.entity_description = description
+        self._attr_unique_id = f"{entry_id}/tracker/{mobile_app}/{description.key}"
+        self._attr_name = f"{uploader.device_name} {description.name}"
+        self._attr_device_info = device_info
+
+    @property
+    def native_value(self) -> StateType:  # type: ignore[override]
+        """Return the state of the sensor."""
+        return self.entity_description.value_fn(self._uploader)
+
+    async def async_added_to_hass(self) -> None:
+        """Update the state after every upload."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self._uploader.async_add_listener(self._async_handle_upload_result)
+        )
+
+    @callback
+    def _async_handle_upload_result(self, success: bool) -> None:
+        """Write the new telemetry after a batch was sent."""
+        self.async_write_ha_state()
+
+
+class DawarichRefreshDurationSensor(
+    CoordinatorEntity[DawarichStatsCoordinator], SensorEntity
+):  # type: ignore[incompatible-subclass]
+    """Diagnostic sensor showing how long fetching the stats took."""
+
+    def __init__(
+        self,
+        coordinator: DawarichStatsCoordinator,
+        description: SensorEntityDescription,
+        entry_id: str,
+        device_name: str,
+        device_info: DeviceInfo,
+    ):
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_unique_id = f"{entry_id}/{description.key}"
+        self._attr_name = f"{device_name} {description.name}"
+        self._attr_device_info = device_info
+
+    @property
+    def native_value(self) -> StateType:  # type: ignore[override]
+        """Return the state of the sensor."""
+        return self.coordinator.refresh_duration.last
+
+
+class DawarichAreaSensor(CoordinatorEntity[DawarichAreasCoordinator], SensorEntity):  # type: ignore[incompatible-subclass]
+    """Sensor showing the Dawarich area a tracked device is in.
+
+    Every location of the device is looked up in the local index of the
+    areas, and the state is only written when the area changes. The state is
+    unknown while the device is outside all areas.
+    """
+
+    def __init__(
+        self,
+        coordinator: DawarichAreasCoordinator,
+        entry_id: str,
+        device_name: str,
+        mobile_app: str,
+        listener: DawarichTrackerListener,
+        device_info: DeviceInfo,
+        description: SensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._mobile_app = mobile_app
+        self._listener = listener
+        self.entity_description = description
+        self._attr_unique_id = f"{entry_id}/tracker/{mobile_app}/{description.key}"
+        self._attr_name = f"{device_name} {description.name}"
+        self._attr_device_info = device_info
+        self._location: tuple[float, float] | None = None
+        self._area: DawarichArea | None = None
+
+    @property
+    def native_value(self) -> StateType:  # type: ignore[override]
+        """Return the name of the area the device is in."""
+        return None if self._area is None else self._area.name
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:  # type: ignore[override]
+        """Return the id of the area the device is in."""
+        return None if self._area is None else {"area_id": self._area.id}
+
+    async def async_added_to_hass(self) -> None:
+        """Start from the current location and follow the tracked device."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self._listener.async_register(self._mobile_app, self._async_handle_state)
+        )
+        if (state := self.hass.states.get(self._mobile_app)) is not None and (
+            point := point_from_state(state)
+        ) is not None:
+            self._location = (point.latitude, point.longitude)
+            self._area = self._async_lookup()
+
+    @callback
+    def _async_lookup(self) -> DawarichArea | None:
+        """Return the area of the last known location."""
+        if self._location is None:
+            return None
+        return self.coordinator.index.lookup(*self._location)
+
+    @callback
+    def _async_handle_state(self, event: Event[EventStateChangedData]) -> None:
+        """Look up the area of a new location of the tracked device."""
+        if (new_state := event.data["new_state"]) is None or (
+            point := point_from_state(new_state)
+        ) is None:
+            return
+        self._location = (point.latitude, point.longitude)
+        if (area := self._async_lookup()) != self._area:
+            self._area = area
+            self.async_write_ha_state()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Look the last known location up again in the new areas."""
+        self._area = self._async_lookup()
+        super()._handle_coordinator_update()
+
+
+class DawarichTripSensor(SensorEntity):
+    """Sensor showing the current or last trip of a tracked device."""
+
+    _attr_should_poll = False
+    entity_description: DawarichTripSensorEntityDescription
+
+    def __init__(
+        self,
+        entry_id: str,
+        device_name: str,
+        mobile_app: str,
+        segmenter: DawarichTripSegmenter,
+        device_info: DeviceInfo,
+        description: DawarichTripSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        self._segmenter = segmenter
+        self.entity_description = description
+        self._attr_unique_id = f"{entry_id}/tracker/{mobile_app}/{description.key}"
+        self._attr_name = f"{device_name} {description.name}"
+        self._attr_device_info = device_info
+        self._last_written: StateType | datetime = None
+
+    @property
+    def native_value(self) -> StateType | datetime:  # type: ignore[override]
+        """Return the state of the sensor."""
+        return self.entity_description.value_fn(self._segmenter)
+
+    async def async_added_to_hass(self) -> None:
+        """Follow the trips of the tracked device."""
+        await super().async_added_to_hass()
+        self._last_written = self.native_value
+        self.async_on_remove(
+            self._segmenter.async_add_listener(self._async_handle_point)
+        )
+
+    @callback
+    def _async_handle_point(self) -> None:
+        """Write the state only when the value of this sensor changed."""
+        if (value := self.native_value) == self._last_written:
+            return
+        self._last_written = value
+        self.async_write_ha_state()
+
+
+class DawarichCounterSensor(RestoreSensor):
+    """Sensor counting the distance or points of a tracked device in a period.
+
+    The counters are kept from the points that are sent, and restored after
+    a restart while their period has not ended. ``last_reset`` is the start
+    of the current day or week.
+    """
+
+    _attr_should_poll = False
+    entity_description: DawarichCounterSensorEntityDescription
+
+    def __init__(
+        self,
+        entry_id: str,
+        device_name: str,
+        mobile_app: str,
+        counter: DawarichDistanceCounter,
+        device_info: DeviceInfo,
+        description: DawarichCounterSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        self._counter = counter
+        self.entity_description = description
+        self._attr_unique_id = f"{entry_id}/tracker/{mobile_app}/{description.key}"
+        self._attr_name = f"{device_name} {description.name}"
+        self._attr_device_info = device_info
+        self._last_written: tuple[StateType, datetime] | None = None
+
+    @property
+    def native_value(self) -> StateType:  # type: ignore[override]
+        """Return the counted distance or points."""
+        return getattr(self._counter, self.entity_description.value_key)
+
+    @property
+    def last_reset(self) -> datetime:  # type: ignore[override]
+        """Return the start of the current period."""
+        return self._counter.start
+
+    async def async_added_to_hass(self) -> None:
+        """Restore the counter and follow its changes."""
+        await super().async_added_to_hass()
+        if (
+            (last_state := await self.async_get_last_state()) is not None
+            and (last_reset := last_state.attributes.get("last_reset")) is not None
+            and (last_reset := dt_util.parse_datetime(last_reset)) is not None
+            and (last_data := await self.async_get_last_sensor_data()) is not None
+            and isinstance(last_data.native_value, int | float)
+        ):
+            self._counter.async_restore(
+                last_reset,
+                **{self.entity_description.value_key: last_data.native_value},
+            )
+        self._last_written = (self.native_value, self.last_reset)
+        self.async_on_remove(
+            self._counter.async_add_listener(self._async_handle_update)
+        )
+
+    @callback
+    def _async_handle_update(self) -> None:
+        """Write the state only when the value of this sensor changed."""
+        current = (self.native_value, self.last_reset)
+        if current == self._last_written:
+            return
+        self._last_written = current
+        self.async_write_ha_state()
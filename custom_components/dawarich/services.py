@@ -0,0 +1,172 @@
+"""Services of the Dawarich integration."""
+
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+import voluptuous as vol
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, RECENT_POINTS_SIZE
+from .exporter import ExportFormat, async_export_points
+from .thinning import DawarichPointThinner
+
+if TYPE_CHECKING:
+    from . import DawarichConfigEntry
+
+SERVICE_IMPORT_HISTORY = "import_history"
+SERVICE_EXPORT_POINTS = "export_points"
+SERVICE_GET_RECENT_POINTS = "get_recent_points"
+
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_RESTART = "restart"
+ATTR_FILENAME = "filename"
+ATTR_FORMAT = "format"
+ATTR_LIMIT = "limit"
+
+IMPORT_HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_ENTITY_ID): cv.entity_id,
+        vol.Required(ATTR_START): cv.datetime,
+        vol.Optional(ATTR_END): cv.datetime,
+        vol.Optional(ATTR_RESTART, default=False): cv.boolean,
+    }
+)
+
+EXPORT_POINTS_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_FILENAME): cv.string,
+        vol.Optional(ATTR_FORMAT, default=ExportFormat.GPX): vol.Coerce(ExportFormat),
+        vol.Required(ATTR_START): cv.datetime,
+        vol.Optional(ATTR_END): cv.datetime,
+    }
+)
+
+GET_RECENT_POINTS_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_ENTITY_ID): cv.entity_id,
+        vol.Optional(ATTR_LIMIT): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=RECENT_POINTS_SIZE)
+        ),
+    }
+)
+
+
+def _get_entry(hass: HomeAssistant, entry_id: str) -> "DawarichConfigEntry":
+    """Return the loaded Dawarich config entry with entry_id."""
+    entry = hass.config_entries.async_get_entry(entry_id)
+    if entry is None or entry.domain != DOMAIN:
+        raise ServiceValidationError(f"{entry_id} is not a Dawarich config entry")
+    if entry.state is not ConfigEntryState.LOADED:
+        raise ServiceValidationError(f"{entry.title} is not loaded")
+    return entry
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Return value in UTC, treating a naive value as local time."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=dt_util.get_default_time_zone())
+    return dt_util.as_utc(value)
+
+
+def _get_period(call: ServiceCall) -> tuple[datetime, datetime]:
+    """Return the start and end of the period of a service call in UTC."""
+    start = _as_utc(call.data[ATTR_START])
+    end = _as_utc(call.data.get(ATTR_END) or dt_util.utcnow())
+    if start >= end:
+        raise ServiceValidationError("The start must be before the end")
+    return start, end
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the Dawarich services."""
+
+    async def async_import_history(call: ServiceCall) -> ServiceResponse:
+        """Send the recorder history of a tracked device to Dawarich."""
+        entry = _get_entry(hass, call.data[ATTR_CONFIG_ENTRY_ID])
+        entity_id = call.data[ATTR_ENTITY_ID]
+        if (uploader := entry.runtime_data.uploaders.get(entity_id)) is None:
+            raise ServiceValidationError(f"{entity_id} is not tracked by {entry.title}")
+        if "recorder" not in hass.config.components:
+            raise ServiceValidationError("The recorder is not running")
+
+        start, end = _get_period(call)
+        return await entry.runtime_data.importer.async_import(
+            entity_id,
+            uploader.device_name,
+            start,
+            # Without an end a retry continues up to the time of the retry
+            end if call.data.get(ATTR_END) else None,
+            DawarichPointThinner.from_options(entry.options),
+            restart=call.data[ATTR_RESTART],
+        )
+
+    async def async_export_points_service(call: ServiceCall) -> ServiceResponse:
+        """Write the points Dawarich has for a period to a file."""
+        entry = _get_entry(hass, call.data[ATTR_CONFIG_ENTRY_ID])
+        filename = call.data[ATTR_FILENAME]
+        if not hass.config.is_allowed_path(filename):
+            raise ServiceValidationError(
+                f"Cannot write to {filename}, add its directory to allowlist_external_dirs"
+            )
+        start, end = _get_period(call)
+        points = await async_export_points(
+            hass,
+            entry.runtime_data.api,
+            filename,
+            call.data[ATTR_FORMAT],
+            start,
+            end,
+            entry.title,
+        )
+        return {"points": points}
+
+    async def async_get_recent_points(call: ServiceCall) -> ServiceResponse:
+        """Return the last locations of a tracked device."""
+        entry = _get_entry(hass, call.data[ATTR_CONFIG_ENTRY_ID])
+        entity_id = call.data[ATTR_ENTITY_ID]
+        if (recent := entry.runtime_data.recent_points.get(entity_id)) is None:
+            raise ServiceValidationError(f"{entity_id} is not tracked by {entry.title}")
+        return {
+            "points": [
+                point.as_dict() for point in recent.points(call.data.get(ATTR_LIMIT))
+            ]
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_IMPORT_HISTORY,
+        async_import_history,
+        schema=IMPORT_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT_POINTS,
+        async_export_points_service,
+        schema=EXPORT_POINTS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_RECENT_POINTS,
+        async_get_recent_points,
+        schema=GET_RECENT_POINTS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
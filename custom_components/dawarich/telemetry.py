@@ -0,0 +1,96 @@
+"""Telemetry of the Dawarich upload pipeline and coordinators."""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+from .const import POINT_DELAY_BUCKETS, UPLOAD_LATENCY_BUCKETS
+
+
+@dataclass(slots=True)
+class DawarichHistogram:
+    """Count observed durations in buckets with fixed upper bounds in seconds."""
+
+    bounds: tuple[float, ...]
+    counts: list[int] = field(init=False)
+    count: int = 0
+    total: float = 0
+    last: float | None = None
+
+    def __post_init__(self) -> None:
+        """Create a bucket for every bound and one for larger values."""
+        self.counts = [0] * (len(self.bounds) + 1)
+
+    def observe(self, value: float) -> None:
+        """Add a duration to the histogram."""
+        index = next(
+            (i for i, bound in enumerate(self.bounds) if value <= bound),
+            len(self.bounds),
+        )
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        self.last = value
+
+    @property
+    def mean(self) -> float | None:
+        """Return the mean of all observed durations."""
+        return self.total / self.count if self.count else None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the histogram for diagnostics."""
+        labels = [f"<={bound}" for bound in self.bounds] + [f">{self.bounds[-1]}"]
+        return {
+            "buckets": dict(zip(labels, self.counts, strict=True)),
+            "count": self.count,
+            "mean": self.mean,
+            "last": self.last,
+        }
+
+
+@dataclass(slots=True)
+class DawarichUploadTelemetry:
+    """Counters and latencies of the uploads of a tracked device.
+
+    ``upload_latency`` holds the duration of the requests to Dawarich, and
+    ``point_delay`` how old points were when Dawarich accepted them, which
+    includes the time they waited in the outbox.
+    """
+
+    points_sent: int = 0
+    points_failed: int = 0
+    points_dropped: int = 0
+    points_coalesced: int = 0
+    points_out_of_order: int = 0
+    points_rejected: int = 0
+    points_in_flight: int = 0
+    requests_sent: int = 0
+    requests_failed: int = 0
+    last_error_code: int | None = None
+    last_error: str | None = None
+    last_success: datetime | None = None
+    upload_latency: DawarichHistogram = field(
+        default_factory=lambda: DawarichHistogram(UPLOAD_LATENCY_BUCKETS)
+    )
+    point_delay: DawarichHistogram = field(
+        default_factory=lambda: DawarichHistogram(POINT_DELAY_BUCKETS)
+    )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the telemetry for diagnostics."""
+        return {
+            "points_sent": self.points_sent,
+            "points_failed": self.points_failed,
+            "points_dropped": self.points_dropped,
+            "points_coalesced": self.points_coalesced,
+            "points_out_of_order": self.points_out_of_order,
+            "points_rejected": self.points_rejected,
+            "points_in_flight": self.points_in_flight,
+            "requests_sent": self.requests_sent,
+            "requests_failed": self.requests_failed,
+            "last_error_code": self.last_error_code,
+            "last_error": self.last_error,
+            "last_success": self.last_success,
+            "upload_latency": self.upload_latency.as_dict(),
+            "point_delay": self.point_delay.as_dict(),
+        }
@@ -0,0 +1,96 @@
+"""Client-side thinning of location fixes before they are uploaded."""
+
+from collections.abc import Mapping
+from typing import Any, Self
+
+from .const import (
+    CONF_MIN_DISTANCE,
+    CONF_MIN_INTERVAL,
+    CONF_SIMPLIFY_TOLERANCE,
+    DEFAULT_MIN_DISTANCE,
+    DEFAULT_MIN_INTERVAL,
+    DEFAULT_SIMPLIFY_TOLERANCE,
+)
+from .helpers import haversine_distance
+from .models import DawarichPoint
+
+
+class DawarichPointThinner:
+    """Decide which fixes of a single device are worth sending to Dawarich.
+
+    A fix is dropped when it is closer than ``min_distance`` metres (or its
+    reported GPS accuracy, whichever is larger) to the last accepted fix, or
+    when it arrives less than ``min_interval`` seconds after it. Fixes that
+    are not newer than the last accepted fix are always dropped. With a
+    ``simplify_tolerance`` the remaining fixes are run through a dead
+    reckoning simplifier: a fix is only kept when it is further than the
+    tolerance from where the last two accepted fixes predict the device to be.
+    Every check only looks at the last two accepted fixes, so each fix is
+    handled in constant time without buffering.
+    """
+
+    def __init__(
+        self,
+        min_distance: float = 0,
+        min_interval: float = 0,
+        simplify_tolerance: float = 0,
+    ) -> None:
+        """Initialize the thinner, a value of 0 disables the check."""
+        self._min_distance = min_distance
+        self._min_interval = min_interval
+        self._simplify_tolerance = simplify_tolerance
+        self._last: DawarichPoint | None = None
+        self._previous: DawarichPoint | None = None
+
+    @classmethod
+    def from_options(cls, options: Mapping[str, Any]) -> Self:
+        """Create a thinner from the options of a config entry."""
+        return cls(
+            min_distance=options.get(CONF_MIN_DISTANCE, DEFAULT_MIN_DISTANCE),
+            min_interval=options.get(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL),
+            simplify_tolerance=options.get(
+                CONF_SIMPLIFY_TOLERANCE, DEFAULT_SIMPLIFY_TOLERANCE
+            ),
+        )
+
+    def accept(self, point: DawarichPoint) -> bool:
+        """Return True if the point should be uploaded."""
+        if (last := self._last) is not None:
+            elapsed = (point.timestamp - last.timestamp).total_seconds()
+            # Older fixes would move the baseline of the next ones backwards
+            if elapsed <= 0 or elapsed < self._min_interval:
+                return False
+
+            if self._min_distance:
+                threshold = max(self._min_distance, point.horizontal_accuracy or 0)
+                distance = haversine_distance(
+                    last.latitude, last.longitude, point.latitude, point.longitude
+                )
+                if distance < threshold:
+                    return False
+
+            if self._simplify_tolerance and self._is_predicted(point, elapsed):
+                return False
+
+        self._previous, self._last = self._last, point
+        return True
+
+    def _is_predicted(self, point: DawarichPoint, elapsed: float) -> bool:
+        """Return True if the point lies where the last accepted fixes predict."""
+        last = self._last
+        previous = self._previous
+        if last is None or previous is None:
+            return False
+        segment = (last.timestamp - previous.timestamp).total_seconds()
+        if segment <= 0 or elapsed <= 0:
+            return False
+
+        ratio = elapsed / segment
+        predicted_latitude = last.latitude + (last.latitude - previous.latitude) * ratio
+        predicted_longitude = (
+            last.longitude + (last.longitude - previous.longitude) * ratio
+        )
+        deviation = haversine_distance(
+            predicted_latitude, predicted_longitude, point.latitude, point.longitude
+        )
+        return deviation <= self._simplify_tolerance
@@ -0,0 +1,102 @@
+"""Shared state change subscription for the tracked devices of an entry."""
+
+import logging
+from collections.abc import Callable, Coroutine
+from typing import Any
+
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    Event,
+    EventStateChangedData,
+    HassJob,
+    HomeAssistant,
+    callback,
+)
+from homeassistant.helpers.event import async_track_state_change_event
+
+_LOGGER = logging.getLogger(__name__)
+
+type StateChangeAction = Callable[
+    [Event[EventStateChangedData]], Coroutine[Any, Any, None] | None
+]
+
+# Attributes a location is built from, see point_from_attributes
+LOCATION_ATTRIBUTES = (
+    "latitude",
+    "longitude",
+    "gps_accuracy",
+    "altitude",
+    "vertical_accuracy",
+    "speed",
+    "velocity",
+)
+
+
+class DawarichTrackerListener:
+    """Listen to all tracked devices of an entry with a single subscription.
+
+    Sensors of a device register a handler for it once they are added to
+    Home Assistant, events for devices without a registered handler (for
+    example because their sensors are disabled) are ignored. State changes
+    that leave the location attributes unchanged, such as a new state or
+    another attribute, are dropped before any handler runs. Battery-only
+    changes are passed on unless ``coalesce_battery`` is set, in which case
+    the new battery level is sent with the next location instead.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entity_ids: list[str],
+        coalesce_battery: bool = False,
+    ) -> None:
+        """Initialize the listener."""
+        self._hass = hass
+        self._entity_ids = entity_ids
+        self._attributes = LOCATION_ATTRIBUTES
+        if not coalesce_battery:
+            self._attributes += ("battery",)
+        self._jobs: dict[str, list[HassJob[[Event[EventStateChangedData]], Any]]] = {}
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Subscribe to state changes of all tracked devices."""
+        return async_track_state_change_event(
+            self._hass, self._entity_ids, self._async_dispatch
+        )
+
+    @callback
+    def async_register(
+        self, entity_id: str, action: StateChangeAction
+    ) -> CALLBACK_TYPE:
+        """Handle state changes of entity_id with action."""
+        job = HassJob(action, f"dawarich tracker {entity_id}")
+        self._jobs.setdefault(entity_id, []).append(job)
+
+        @callback
+        def remove_handler() -> None:
+            jobs = self._jobs[entity_id]
+            jobs.remove(job)
+            if not jobs:
+                del self._jobs[entity_id]
+
+        return remove_handler
+
+    @callback
+    def _async_dispatch(self, event: Event[EventStateChangedData]) -> None:
+        """Pass a state change on to the handlers of its device."""
+        if (jobs := self._jobs.get(event.data["entity_id"])) is None:
+            return
+        if (old_state := event.data["old_state"]) is not None and (
+            new_state := event.data["new_state"]
+        ) is not None:
+            old = old_state.attributes
+            new = new_state.attributes
+            if all(old.get(key) == new.get(key) for key in self._attributes):
+                _LOGGER.debug(
+                    "Location of %s did not change, skipping update",
+                    event.data["entity_id"],
+                )
+                return
+        for job in jobs:
+            self._hass.async_run_hass_job(job, event)
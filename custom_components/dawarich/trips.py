@@ -0,0 +1,168 @@
+"""Live segmentation of the locations of a device into trips and stays."""
+
+from collections.abc import Callable
+from datetime import datetime
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+
+from .const import TRIP_MIN_SPEED, TRIP_STAY_DURATION, TRIP_STAY_RADIUS
+from .helpers import haversine_distance
+from .models import DawarichPoint
+
+
+class DawarichTripSegmenter:
+    """Split the locations of a single device into trips and stays.
+
+    The last location that moved is kept as the anchor. A location further
+    than ``TRIP_STAY_RADIUS`` metres from the anchor, or reported with a
+    speed of at least ``TRIP_MIN_SPEED`` m/s, moves the anchor and starts a
+    trip if the device was stationary. Once the device stayed within the
+    radius of the anchor for ``TRIP_STAY_DURATION`` the trip ends at the
+    anchor, dropping the distance of the GPS noise around it. Devices often
+    stop reporting once they stay, so the trip also ends when no location
+    moved the anchor for that long, and a gap of that long between two
+    locations counts as a stay. Locations less accurate than the radius are
+    ignored. Every location is handled in constant time, and the finished
+    trip is kept until the next one starts.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the segmenter."""
+        self._hass = hass
+        self._unsub_stay: CALLBACK_TYPE | None = None
+        self._last: DawarichPoint | None = None
+        self._anchor: DawarichPoint | None = None
+        self._anchor_distance = 0.0
+        self._trip_start: datetime | None = None
+        self._trip_end: datetime | None = None
+        self._distance = 0.0
+        self._listeners: list[Callable[[], None]] = []
+        self.moving = False
+        self.stationary_since: datetime | None = None
+
+    @property
+    def trip_distance(self) -> float | None:
+        """Return the distance of the current or last trip in metres."""
+        return None if self._trip_start is None else self._distance
+
+    @property
+    def trip_duration(self) -> float | None:
+        """Return the duration of the current or last trip in seconds."""
+        if self._trip_start is None or self._trip_end is None:
+            return None
+        return (self._trip_end - self._trip_start).total_seconds()
+
+    @property
+    def trip_average_speed(self) -> float | None:
+        """Return the average speed of the current or last trip in m/s."""
+        if not (duration := self.trip_duration):
+            return None
+        return self._distance / duration
+
+    @callback
+    def async_add_listener(self, update_callback: Callable[[], None]) -> CALLBACK_TYPE:
+        """Listen for locations that were added."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop waiting for the device to stay."""
+        if self._unsub_stay is not None:
+            self._unsub_stay()
+            self._unsub_stay = None
+
+    @callback
+    def async_add_point(self, point: DawarichPoint) -> None:
+        """Add a location of the device."""
+        last = self._last
+        if last is not None and point.timestamp <= last.timestamp:
+            return
+        if (point.horizontal_accuracy or 0) > TRIP_STAY_RADIUS:
+            return
+        self._last = point
+
+        # The device stayed somewhere while it sent no locations
+        gap = (
+            last is not None and point.timestamp - last.timestamp >= TRIP_STAY_DURATION
+        )
+        if gap and self.moving:
+            self._async_end_trip()
+
+        anchor = self._anchor
+        if last is None or anchor is None:
+            self._anchor = point
+            self.stationary_since = point.timestamp
+        elif (point.speed or 0) >= TRIP_MIN_SPEED or haversine_distance(
+            anchor.latitude, anchor.longitude, point.latitude, point.longitude
+        ) > TRIP_STAY_RADIUS:
+            self._async_move(last, point, gap)
+        elif self.moving:
+            self._distance += haversine_distance(
+                last.latitude, last.longitude, point.latitude, point.longitude
+            )
+            self._trip_end = point.timestamp
+            if point.timestamp - anchor.timestamp >= TRIP_STAY_DURATION:
+                self._async_end_trip()
+
+        self._async_notify()
+
+    @callback
+    def _async_move(self, last: DawarichPoint, point: DawarichPoint, gap: bool) -> None:
+        """Handle a location away from the anchor."""
+        step = haversine_distance(
+            last.latitude, last.longitude, point.latitude, point.longitude
+        )
+        if self.moving:
+            self._distance += step
+        elif gap:
+            # When the device left after the gap is unknown, start from here
+            self._async_start_trip(point.timestamp, 0.0)
+        else:
+            # The trip started when the device left its last location
+            self._async_start_trip(last.timestamp, step)
+        self._trip_end = point.timestamp
+        self._anchor = point
+        self._anchor_distance = self._distance
+
+        self.async_stop()
+        self._unsub_stay = async_track_point_in_utc_time(
+            self._hass, self._async_handle_stay, point.timestamp + TRIP_STAY_DURATION
+        )
+
+    @callback
+    def _async_start_trip(self, start: datetime, distance: float) -> None:
+        """Start a trip."""
+        self.moving = True
+        self.stationary_since = None
+        self._trip_start = start
+        self._distance = distance
+
+    @callback
+    def _async_end_trip(self) -> None:
+        """End the trip when the device arrived at the anchor."""
+        self.async_stop()
+        self.moving = False
+        if (anchor := self._anchor) is not None:
+            self.stationary_since = self._trip_end = anchor.timestamp
+        self._distance = self._anchor_distance
+
+    @callback
+    def _async_handle_stay(self, _now: datetime) -> None:
+        """End the trip when no location moved the anchor for a while."""
+        self._unsub_stay = None
+        if self.moving:
+            self._async_end_trip()
+            self._async_notify()
+
+    @callback
+    def _async_notify(self) -> None:
+        """Tell the listeners the trip or stay changed."""
+        for update_callback in self._listeners:
+            update_callback()
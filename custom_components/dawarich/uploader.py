@@ -0,0 +1,343 @@
+"""Batched point uploads for the Dawarich integration."""
+
+import asyncio
+import logging
+import random
+import time
+from collections.abc import Callable, Iterable
+from datetime import datetime, timedelta
+from enum import StrEnum
+
+from dawarich_api.response_model import AddOnePointResponse
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import dt as dt_util
+
+from .api import DawarichClient
+from .const import (
+    CIRCUIT_BREAKER_THRESHOLD,
+    UPLOAD_BATCH_SIZE,
+    UPLOAD_FLUSH_INTERVAL,
+    UPLOAD_MAX_BATCH_SIZE,
+    UPLOAD_RETRY_MAX_DELAY,
+    UPLOAD_RETRY_MAX_DOUBLINGS,
+    UPLOAD_RETRY_MIN_DELAY,
+)
+from .helpers import is_auth_error, is_rejected_request
+from .models import DawarichPoint
+from .outbox import DawarichOutbox
+from .telemetry import DawarichUploadTelemetry
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class DawarichQueueResult(StrEnum):
+    """What became of a point handed to the uploader."""
+
+    QUEUED = "queued"
+    REPLACED = "replaced"
+    SKIPPED = "skipped"
+
+
+class DawarichPointUploader:
+    """Queue points for a device and upload them to Dawarich in batches.
+
+    Every point is written to the outbox first. The outbox is flushed once
+    ``batch_size`` points are waiting or ``flush_interval`` has passed since
+    the first waiting point, whichever comes first. Only one batch of at most
+    ``max_batch_size`` points is sent at a time, so points reach Dawarich in
+    order, and points that are not newer than the previous point are skipped.
+    With a ``coalesce_window`` a point reported within the window of the first
+    waiting point of that window replaces the previous waiting point, so only
+    the latest point of every window is sent.
+
+    A batch Dawarich rejects with a client error is dropped, since sending it
+    again would fail the same way. Other failed uploads are retried with a
+    jittered exponential backoff, new points are only queued in the meantime. After ``CIRCUIT_BREAKER_THRESHOLD`` failures
+    in a row the circuit opens, and every retry first checks the health
+    endpoint so no batch is sent until Dawarich is reachable again. When the
+    API key is rejected uploads stop until the entry is reloaded, for example
+    after reauthentication. Once Dawarich recovers the backlog is replayed in
+    order.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: DawarichClient,
+        device_name: str,
+        outbox: DawarichOutbox,
+        *,
+        batch_size: int = UPLOAD_BATCH_SIZE,
+        flush_interval: timedelta = UPLOAD_FLUSH_INTERVAL,
+        max_batch_size: int = UPLOAD_MAX_BATCH_SIZE,
+        coalesce_window: timedelta = timedelta(0),
+        on_auth_failed: Callable[[], None] | None = None,
+    ) -> None:
+        """Initialize the uploader."""
+        self._hass = hass
+        self._api = api
+        self._device_name = device_name
+        self._outbox = outbox
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._max_batch_size = max_batch_size
+        self._coalesce_window = coalesce_window
+        self._coalesce_start: datetime | None = None
+        self._last_timestamp = last.timestamp if (last := outbox.last) else None
+        self._on_auth_failed = on_auth_failed
+        self._failures = 0
+        self._auth_failed = False
+        self._lock = asyncio.Lock()
+        self._flush_task: asyncio.Task[None] | None = None
+        self._unsub_timer: CALLBACK_TYPE | None = None
+        self._listeners: list[Callable[[bool], None]] = []
+        self.telemetry = DawarichUploadTelemetry()
+
+    @property
+    def device_name(self) -> str:
+        """Return the name of the device in Dawarich."""
+        return self._device_name
+
+    @property
+    def queued_points(self) -> int:
+        """Return the number of points waiting to be sent."""
+        return len(self._outbox)
+
+    @property
+    def consecutive_failures(self) -> int:
+        """Return the number of uploads that failed in a row."""
+        return self._failures
+
+    @property
+    def circuit_open(self) -> bool:
+        """Return whether uploads wait for Dawarich to be healthy again."""
+        return self._failures >= CIRCUIT_BREAKER_THRESHOLD
+
+    @callback
+    def async_add_listener(
+        self, update_callback: Callable[[bool], None]
+    ) -> CALLBACK_TYPE:
+        """Listen for upload results, called with True on success."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def async_start(self) -> None:
+        """Replay points left in the outbox by a previous run."""
+        if len(self._outbox):
+            self._async_schedule_flush()
+
+    @callback
+    def async_add_point(self, point: DawarichPoint) -> DawarichQueueResult:
+        """Queue a point and schedule a flush if needed.
+
+        Return whether the point was queued, replaced the newest waiting point
+        or was skipped.
+        """
+        if self._last_timestamp is not None and point.timestamp <= self._last_timestamp:
+            _LOGGER.debug(
+                "Skipping point from %s, it is not newer than the previous point",
+                point.timestamp,
+            )
+            self.telemetry.points_out_of_order += 1
+            return DawarichQueueResult.SKIPPED
+        self._last_timestamp = point.timestamp
+        if self._async_coalesce(point):
+            return DawarichQueueResult.REPLACED
+
+        self.telemetry.points_dropped += self._outbox.async_append(point)
+        if self._auth_failed:
+            return DawarichQueueResult.QUEUED
+        if len(self._outbox) >= self._batch_size and not self._failures:
+            self._async_schedule_flush()
+        else:
+            self._async_start_timer(self._flush_interval)
+        return DawarichQueueResult.QUEUED
+
+    @callback
+    def async_add_points(self, points: Iterable[DawarichPoint]) -> None:
+        """Queue points that arrived together and send them right away."""
+        for point in points:
+            self.async_add_point(point)
+        if len(self._outbox) and not self._failures and not self._auth_failed:
+            self._async_schedule_flush()
+
+    @callback
+    def _async_coalesce(self, point: DawarichPoint) -> bool:
+        """Replace the newest waiting point if point is in its window."""
+        if not self._coalesce_window:
+            return False
+        if (
+            self._coalesce_start is not None
+            and point.timestamp - self._coalesce_start < self._coalesce_window
+            # The newest point may not be part of the batch being sent
+            and len(self._outbox) > self.telemetry.points_in_flight
+        ):
+            self._outbox.async_replace_last(point)
+            self.telemetry.points_coalesced += 1
+            return True
+        self._coalesce_start = point.timestamp
+        return False
+
+    @callback
+    def _async_start_timer(self, delay: timedelta) -> None:
+        """Flush the outbox once delay has passed, unless a flush is pending."""
+        if self._unsub_timer is None:
+            self._unsub_timer = async_call_later(
+                self._hass, delay, self._async_flush_timer
+            )
+
+    @callback
+    def _async_retry_later(self) -> None:
+        """Retry after a jittered delay that doubles with every failure."""
+        # Failed health checks keep counting, the exponent must not overflow
+        exponent = min(self._failures - 1, UPLOAD_RETRY_MAX_DOUBLINGS)
+        delay = min(UPLOAD_RETRY_MIN_DELAY * 2**exponent, UPLOAD_RETRY_MAX_DELAY)
+        self._async_start_timer(delay * random.uniform(0.5, 1))
+
+    @callback
+    def _async_flush_timer(self, _now: datetime) -> None:
+        """Handle the flush timer firing."""
+        self._unsub_timer = None
+        self._async_schedule_flush()
+
+    @callback
+    def _async_schedule_flush(self) -> None:
+        """Flush the outbox in the background, unless a flush is under way.
+
+        A running flush keeps sending batches until the outbox is empty, so it
+        also sends the points queued while it waits for Dawarich.
+        """
+        if self._flush_task is not None and not self._flush_task.done():
+            return
+        self._flush_task = self._hass.async_create_background_task(
+            self.async_flush(), name=f"dawarich upload {self._device_name}"
+        )
+
+    async def async_flush(self) -> None:
+        """Upload all waiting points, oldest first."""
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+
+        async with self._lock:
+            if self._auth_failed or not len(self._outbox):
+                return
+            if self.circuit_open and not await self._async_probe():
+                self._failures += 1
+                self._async_retry_later()
+                return
+
+            while points := self._outbox.peek(self._max_batch_size):
+                self.telemetry.points_in_flight = len(points)
+                start = time.monotonic()
+                response = await self._api.add_points(points, self._device_name)
+                self._async_record(points, response, time.monotonic() - start)
+                if response.success:
+                    _LOGGER.debug("Sent %s points to Dawarich API", len(points))
+                    self._failures = 0
+                    self._outbox.async_ack(points)
+                    send_next = True
+                else:
+                    send_next = self._async_handle_failure(points, response)
+
+                for update_callback in list(self._listeners):
+                    update_callback(response.success)
+                if not send_next:
+                    break
+
+    async def _async_probe(self) -> bool:
+        """Check whether Dawarich is healthy before sending to it again."""
+        if await self._api.health() is None:
+            _LOGGER.debug("Dawarich is still unavailable, not sending points")
+            return False
+        _LOGGER.info("Dawarich is available again, resuming uploads")
+        return True
+
+    @callback
+    def _async_handle_failure(
+        self, points: list[DawarichPoint], response: AddOnePointResponse
+    ) -> bool:
+        """Handle a batch Dawarich did not accept, return whether to send the next.
+
+        A batch Dawarich rejects is dropped, as sending it again would fail the
+        same way. Uploads stop on a rejected API key, and other failures keep
+        the points for a retry.
+        """
+        if is_auth_error(response.response_code, response.error):
+            _LOGGER.error(
+                "Invalid credentials when sending points to Dawarich, "
+                "keeping %s points until the entry is reauthenticated",
+                len(self._outbox),
+            )
+            self._auth_failed = True
+            if self._on_auth_failed is not None:
+                self._on_auth_failed()
+            return False
+
+        if is_rejected_request(response.response_code):
+            _LOGGER.error(
+                "Dawarich rejected %s points with response code %s and error: %s, "
+                "dropping them",
+                len(points),
+                response.response_code,
+                response.error,
+            )
+            # Dawarich answered, so it is reachable
+            self._failures = 0
+            self.telemetry.points_dropped += len(points)
+            self._outbox.async_ack(points)
+            return True
+
+        _LOGGER.error(
+            "Error sending %s points to Dawarich API response code %s and error: %s",
+            len(points),
+            response.response_code,
+            response.error,
+        )
+        self._failures += 1
+        if self._failures == CIRCUIT_BREAKER_THRESHOLD:
+            _LOGGER.warning(
+                "Sending points to Dawarich failed %s times in a row, waiting "
+                "for Dawarich to be healthy before sending points again",
+                self._failures,
+            )
+        self._async_retry_later()
+        return False
+
+    @callback
+    def _async_record(
+        self,
+        points: list[DawarichPoint],
+        response: AddOnePointResponse,
+        duration: float,
+    ) -> None:
+        """Record the outcome of sending a batch in the telemetry."""
+        telemetry = self.telemetry
+        telemetry.points_in_flight = 0
+        telemetry.requests_sent += 1
+        telemetry.upload_latency.observe(duration)
+        if not response.success:
+            telemetry.requests_failed += 1
+            telemetry.points_failed += len(points)
+            telemetry.last_error_code = response.response_code
+            telemetry.last_error = response.error
+            return
+        telemetry.points_sent += len(points)
+        telemetry.last_success = now = dt_util.utcnow()
+        for point in points:
+            telemetry.point_delay.observe((now - point.timestamp).total_seconds())
+
+    async def async_shutdown(self) -> None:
+        """Try to send waiting points and persist whatever is left."""
+        await self.async_flush()
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+        await self._outbox.async_save()
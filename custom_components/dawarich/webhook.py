@@ -0,0 +1,233 @@
+"""Webhook receiving locations from OwnTracks and Overland."""
+
+import logging
+from collections import defaultdict
+from collections.abc import Awaitable, Callable, Mapping
+from datetime import UTC, datetime
+from functools import partial
+from http import HTTPStatus
+from typing import Any
+
+import voluptuous as vol
+from aiohttp import web
+from aiohttp.hdrs import METH_POST
+from homeassistant.components import webhook
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import slugify
+
+from .const import DOMAIN
+from .helpers import point_from_attributes
+from .models import DawarichPoint
+from .thinning import DawarichPointThinner
+from .uploader import DawarichPointUploader
+
+_LOGGER = logging.getLogger(__name__)
+
+OWNTRACKS_LOCATION_SCHEMA = vol.Schema(
+    {
+        vol.Required("lat"): cv.latitude,
+        vol.Required("lon"): cv.longitude,
+        vol.Required("tst"): vol.Coerce(int),
+        vol.Optional("acc"): vol.Coerce(float),
+        vol.Optional("alt"): vol.Coerce(float),
+        vol.Optional("vac"): vol.Coerce(float),
+        vol.Optional("vel"): vol.Coerce(float),
+        vol.Optional("batt"): vol.Coerce(int),
+    },
+    extra=vol.ALLOW_EXTRA,
+)
+
+OVERLAND_LOCATION_SCHEMA = vol.Schema(
+    {
+        vol.Required("geometry"): vol.Schema(
+            {
+                vol.Required("coordinates"): vol.ExactSequence(
+                    [cv.longitude, cv.latitude]
+                )
+            },
+            extra=vol.ALLOW_EXTRA,
+        ),
+        vol.Required("properties"): vol.Schema(
+            {
+                vol.Required("timestamp"): cv.datetime,
+                vol.Optional("horizontal_accuracy"): vol.Coerce(float),
+                vol.Optional("altitude"): vol.Coerce(float),
+                vol.Optional("vertical_accuracy"): vol.Coerce(float),
+                vol.Optional("speed"): vol.Coerce(float),
+                vol.Optional("battery_level"): vol.Coerce(float),
+            },
+            extra=vol.ALLOW_EXTRA,
+        ),
+    },
+    extra=vol.ALLOW_EXTRA,
+)
+
+OVERLAND_SCHEMA = vol.Schema(
+    {vol.Required("locations"): [OVERLAND_LOCATION_SCHEMA]}, extra=vol.ALLOW_EXTRA
+)
+
+
+def _valid(value: float | None) -> float | None:
+    """Return value, None for the negative values apps use for unknown."""
+    return None if value is None or value < 0 else value
+
+
+def _device(identity: str | None) -> str:
+    """Return the key of the device an app identified, empty if unknown."""
+    return slugify(identity) if identity else ""
+
+
+def _owntracks_device(message: dict[str, Any], headers: Mapping[str, str]) -> str:
+    """Return the device of an OwnTracks message.
+
+    The topic names the user and device, older versions only send them in
+    headers, and the tracker ID is used when neither is known.
+    """
+    if isinstance(topic := message.get("topic"), str):
+        return _device(topic.removeprefix("owntracks/"))
+    if (user := headers.get("X-Limit-U")) and (device := headers.get("X-Limit-D")):
+        return _device(f"{user}/{device}")
+    tid = message.get("tid")
+    return _device(tid if isinstance(tid, str) else None)
+
+
+def _owntracks_points(
+    payload: dict[str, Any] | list[Any], headers: Mapping[str, str]
+) -> dict[str, list[DawarichPoint]]:
+    """Return the points of an OwnTracks message or list of messages by device.
+
+    Messages other than locations, such as transitions, are ignored.
+    """
+    messages = payload if isinstance(payload, list) else [payload]
+    points: dict[str, list[DawarichPoint]] = defaultdict(list)
+    for message in messages:
+        if not isinstance(message, dict) or message.get("_type") != "location":
+            continue
+        location = OWNTRACKS_LOCATION_SCHEMA(message)
+        # OwnTracks reports the speed in km/h, Home Assistant in m/s
+        speed = _valid(location.get("vel"))
+        attributes = {
+            "latitude": location["lat"],
+            "longitude": location["lon"],
+            "gps_accuracy": _valid(location.get("acc")),
+            "altitude": location.get("alt"),
+            "vertical_accuracy": _valid(location.get("vac")),
+            "speed": None if speed is None else speed / 3.6,
+            "battery": location.get("batt"),
+        }
+        point = point_from_attributes(
+            attributes, datetime.fromtimestamp(location["tst"], UTC)
+        )
+        if point is not None:
+            points[_owntracks_device(location, headers)].append(point)
+    return points
+
+
+def _overland_points(payload: dict[str, Any]) -> dict[str, list[DawarichPoint]]:
+    """Return the points of an Overland batch by device."""
+    points: dict[str, list[DawarichPoint]] = defaultdict(list)
+    for location in OVERLAND_SCHEMA(payload)["locations"]:
+        longitude, latitude = location["geometry"]["coordinates"]
+        properties = location["properties"]
+        battery_level = _valid(properties.get("battery_level"))
+        attributes = {
+            "latitude": latitude,
+            "longitude": longitude,
+            "gps_accuracy": _valid(properties.get("horizontal_accuracy")),
+            "altitude": properties.get("altitude"),
+            "vertical_accuracy": _valid(properties.get("vertical_accuracy")),
+            "speed": _valid(properties.get("speed")),
+            "battery": None if battery_level is None else round(battery_level * 100),
+        }
+        timestamp = properties["timestamp"]
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=UTC)
+        point = point_from_attributes(attributes, timestamp)
+        if point is not None:
+            device_id = properties.get("device_id")
+            points[_device(device_id if isinstance(device_id, str) else None)].append(
+                point
+            )
+    return points
+
+
+class DawarichWebhook:
+    """Receive batches of locations and queue them for upload per device.
+
+    OwnTracks messages and Overland batches are both accepted, the payload
+    decides which one it is. Every device the apps identify gets its own
+    thinner and uploader, so devices posting to the same webhook do not
+    thin out or reorder each other's locations. The locations of a device
+    are thinned like those of device trackers, sorted, and handed to its
+    uploader together, so a batch of buffered locations is sent to Dawarich
+    in one request.
+    """
+
+    def __init__(
+        self,
+        async_get_uploader: Callable[[str], Awaitable[DawarichPointUploader]],
+        thinner_factory: Callable[[], DawarichPointThinner],
+    ) -> None:
+        """Initialize the webhook."""
+        self._async_get_uploader = async_get_uploader
+        self._thinner_factory = thinner_factory
+        self._thinners: dict[str, DawarichPointThinner] = {}
+
+    async def async_handle(
+        self, hass: HomeAssistant, webhook_id: str, request: web.Request
+    ) -> web.Response:
+        """Handle a request to the webhook."""
+        try:
+            payload = await request.json()
+        except ValueError:
+            return web.Response(
+                text="Invalid JSON", status=HTTPStatus.BAD_REQUEST.value
+            )
+
+        overland = isinstance(payload, dict) and "locations" in payload
+        try:
+            points = (
+                _overland_points(payload)
+                if overland
+                else _owntracks_points(payload, request.headers)
+            )
+        except vol.Invalid as err:
+            _LOGGER.debug("Invalid webhook payload: %s", err)
+            return web.Response(
+                text=f"Invalid locations: {err}", status=HTTPStatus.BAD_REQUEST.value
+            )
+
+        for device, device_points in points.items():
+            if (thinner := self._thinners.get(device)) is None:
+                thinner = self._thinners[device] = self._thinner_factory()
+            uploader = await self._async_get_uploader(device)
+            device_points.sort(key=lambda point: point.timestamp)
+            uploader.async_add_points(
+                point for point in device_points if thinner.accept(point)
+            )
+            _LOGGER.debug(
+                "Received %s locations of %s by webhook",
+                len(device_points),
+                uploader.device_name,
+            )
+        # Both apps only drop the locations they sent after this response
+        if overland:
+            return web.json_response({"result": "ok"})
+        return web.json_response([])
+
+
+@callback
+def async_register_webhook(
+    hass: HomeAssistant, webhook_id: str, name: str, handler: DawarichWebhook
+) -> CALLBACK_TYPE:
+    """Register the webhook of an entry, return a callback to unregister it."""
+    webhook.async_register(
+        hass,
+        DOMAIN,
+        name,
+        webhook_id,
+        handler.async_handle,
+        allowed_methods=[METH_POST],
+    )
+    return partial(webhook.async_unregister, hass, webhook_id)
@@ -0,0 +1,38 @@
+"""Tests for the distance and points counters."""
+
+from datetime import timedelta
+
+import pytest
+from homeassistant.util import dt as dt_util
+
+from custom_components.dawarich.counters import (
+    DawarichCounterPeriod,
+    DawarichDistanceCounter,
+)
+from custom_components.dawarich.helpers import haversine_distance
+from custom_components.dawarich.models import DawarichPoint
+
+
+def test_replacing_point_takes_the_place_of_the_last_one() -> None:
+    """Test a coalesced point is counted instead of the point it replaced."""
+    now = dt_util.utcnow()
+    first, replaced, latest = (
+        DawarichPoint(
+            latitude=52.5 + index * 0.01,
+            longitude=13.4,
+            timestamp=now + timedelta(seconds=index),
+        )
+        for index in range(3)
+    )
+    counter = DawarichDistanceCounter(DawarichCounterPeriod.DAY)
+
+    counter.async_add_point(first)
+    counter.async_add_point(replaced)
+    counter.async_add_point(latest, replaces_last=True)
+
+    assert counter.points == 2
+    assert counter.distance == pytest.approx(
+        haversine_distance(
+            first.latitude, first.longitude, latest.latitude, latest.longitude
+        )
+    )
@@ -0,0 +1,94 @@
+"""Tests for the import of recorder history."""
+
+import asyncio
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from dawarich_api.response_model import AddOnePointResponse
+from homeassistant.core import HomeAssistant, State
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util import dt as dt_util
+
+from custom_components.dawarich.importer import DawarichHistoryImporter
+from custom_components.dawarich.models import DawarichPoint
+from custom_components.dawarich.thinning import DawarichPointThinner
+
+
+class FlakyDawarich:
+    """Dawarich API that fails the second batch it gets once."""
+
+    def __init__(self) -> None:
+        """Initialize the API."""
+        self.calls = 0
+        self.points: list[DawarichPoint] = []
+
+    async def add_points(
+        self, points: list[DawarichPoint], device_name: str
+    ) -> AddOnePointResponse:
+        """Add the points, failing the second call."""
+        self.calls += 1
+        if self.calls == 2:
+            return AddOnePointResponse(response_code=502, error="Bad Gateway")
+        self.points.extend(points)
+        return AddOnePointResponse(response_code=200)
+
+
+class Recorder:
+    """Recorder that runs its jobs right away."""
+
+    async def async_add_executor_job(
+        self, target: Callable[..., Any], *args: Any
+    ) -> Any:
+        """Run a job."""
+        return target(*args)
+
+
+def test_open_ended_import_resumes(tmp_path: Path) -> None:
+    """Test an import without an end continues where it was interrupted."""
+    start = dt_util.utcnow() - timedelta(hours=3)
+    states = [
+        State(
+            "device_tracker.phone",
+            "not_home",
+            {"latitude": 52.5 + minute * 0.01, "longitude": 13.4},
+            last_updated=start + timedelta(minutes=minute),
+        )
+        for minute in range(1, 4)
+    ]
+
+    def get_states(entity_id: str, after: datetime, end: datetime) -> list[State]:
+        return [state for state in states if after < state.last_updated <= end]
+
+    async def run() -> list[datetime]:
+        hass = HomeAssistant(str(tmp_path))
+        api = FlakyDawarich()
+        importer = DawarichHistoryImporter(hass, "entry", api)
+        with (
+            patch("custom_components.dawarich.importer.IMPORT_BATCH_SIZE", 1),
+            patch(
+                "custom_components.dawarich.importer.get_instance",
+                return_value=Recorder(),
+            ),
+            patch.object(importer, "_get_states", side_effect=get_states),
+        ):
+            with pytest.raises(HomeAssistantError):
+                await importer.async_import(
+                    "device_tracker.phone",
+                    "phone",
+                    start,
+                    None,
+                    DawarichPointThinner(),
+                )
+            await importer.async_import(
+                "device_tracker.phone", "phone", start, None, DawarichPointThinner()
+            )
+        await hass.async_stop(force=True)
+        return [point.timestamp for point in api.points]
+
+    sent = asyncio.run(run())
+
+    assert sent == [state.last_updated for state in states]
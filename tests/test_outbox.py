@@ -0,0 +1,46 @@
+"""Tests for the persistent outbox."""
+
+import asyncio
+from datetime import timedelta
+from pathlib import Path
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.dawarich.models import DawarichPoint
+from custom_components.dawarich.outbox import DawarichOutbox
+
+
+def test_saved_outbox_matches_the_points_in_memory(tmp_path: Path) -> None:
+    """Test appended, replaced, evicted and acknowledged points are saved."""
+    start = dt_util.utcnow().replace(microsecond=0)
+    points = [
+        DawarichPoint(
+            latitude=52.5 + index * 0.01,
+            longitude=13.4,
+            timestamp=start + timedelta(seconds=index),
+            battery=50,
+        )
+        for index in range(6)
+    ]
+
+    async def run() -> tuple[list[DawarichPoint], list[DawarichPoint]]:
+        hass = HomeAssistant(str(tmp_path))
+        outbox = DawarichOutbox(hass, "test", max_points=3)
+        for point in points[:4]:
+            outbox.async_append(point)
+        outbox.async_replace_last(points[4])
+        outbox.async_ack(outbox.peek(1))
+        outbox.async_append(points[5])
+        await outbox.async_save()
+
+        loaded = DawarichOutbox(hass, "test", max_points=3)
+        await loaded.async_load()
+        result = (outbox.peek(10), loaded.peek(10))
+        await hass.async_stop(force=True)
+        return result
+
+    in_memory, saved = asyncio.run(run())
+
+    assert in_memory == [points[2], points[4], points[5]]
+    assert saved == in_memory
@@ -0,0 +1,29 @@
+"""Tests for the thinning of location fixes."""
+
+from datetime import timedelta
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.dawarich.models import DawarichPoint
+from custom_components.dawarich.thinning import DawarichPointThinner
+
+
+def test_older_fix_does_not_move_the_baseline() -> None:
+    """Test fixes not newer than the last accepted one are dropped."""
+    start = dt_util.utcnow()
+
+    def point(seconds: int, latitude: float) -> DawarichPoint:
+        return DawarichPoint(
+            latitude=latitude,
+            longitude=13.4,
+            timestamp=start + timedelta(seconds=seconds),
+        )
+
+    thinner = DawarichPointThinner(simplify_tolerance=20)
+
+    assert thinner.accept(point(0, 52.5))
+    assert thinner.accept(point(60, 52.51))
+    assert not thinner.accept(point(60, 52.6))
+    assert not thinner.accept(point(30, 52.6))
+    # Still predicted from the fixes at 0 and 60 seconds
+    assert not thinner.accept(point(120, 52.52))
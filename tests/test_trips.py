@@ -0,0 +1,78 @@
+"""Tests for the segmentation of locations into trips."""
+
+import asyncio
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.dawarich.models import DawarichPoint
+from custom_components.dawarich.trips import DawarichTripSegmenter
+
+
+def _drive(
+    segmenter: DawarichTripSegmenter, start: datetime, latitude: float
+) -> datetime:
+    """Add a 10 minute drive north of latitude, return when it arrived."""
+    for minute in range(11):
+        segmenter.async_add_point(
+            DawarichPoint(
+                latitude=latitude + minute * 0.009,
+                longitude=13.4,
+                timestamp=start + timedelta(minutes=minute),
+                horizontal_accuracy=10,
+            )
+        )
+    return start + timedelta(minutes=10)
+
+
+def test_gap_after_a_trip_starts_a_new_trip(tmp_path: Path) -> None:
+    """Test a long gap between two locations counts as a stay."""
+
+    async def run() -> tuple[bool, datetime | None, float | None, float | None]:
+        hass = HomeAssistant(str(tmp_path))
+        segmenter = DawarichTripSegmenter(hass)
+        start = dt_util.utcnow() - timedelta(hours=4)
+        arrived = _drive(segmenter, start, 52.5)
+        # Three hours without locations, then the next drive
+        _drive(segmenter, arrived + timedelta(hours=3), 52.6)
+        result = (
+            segmenter.moving,
+            segmenter.stationary_since,
+            segmenter.trip_duration,
+            segmenter.trip_distance,
+        )
+        segmenter.async_stop()
+        await hass.async_stop(force=True)
+        return result
+
+    moving, stationary_since, duration, distance = asyncio.run(run())
+
+    assert moving
+    assert stationary_since is None
+    assert duration == timedelta(minutes=10).total_seconds()
+    assert distance is not None
+    assert 9000 < distance < 11000
+
+
+def test_trip_ends_without_another_location(tmp_path: Path) -> None:
+    """Test the trip ends once the device stopped reporting for a while."""
+
+    async def run() -> tuple[bool, datetime | None, datetime]:
+        hass = HomeAssistant(str(tmp_path))
+        segmenter = DawarichTripSegmenter(hass)
+        updates: list[bool] = []
+        segmenter.async_add_listener(lambda: updates.append(segmenter.moving))
+        arrived = _drive(segmenter, dt_util.utcnow() - timedelta(minutes=16), 52.5)
+        assert updates[-1]
+        # The stay timer is already due
+        await asyncio.sleep(0.01)
+        result = (segmenter.moving, segmenter.stationary_since, arrived)
+        await hass.async_stop(force=True)
+        return result
+
+    moving, stationary_since, arrived = asyncio.run(run())
+
+    assert not moving
+    assert stationary_since == arrived
@@ -0,0 +1,167 @@
+"""Tests for the batched point uploads."""
+
+import asyncio
+from datetime import timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+from dawarich_api.response_model import AddOnePointResponse
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.dawarich.const import UPLOAD_RETRY_MAX_DELAY
+from custom_components.dawarich.models import DawarichPoint
+from custom_components.dawarich.outbox import DawarichOutbox
+from custom_components.dawarich.uploader import DawarichPointUploader
+
+
+class UnavailableDawarich:
+    """Dawarich API that fails every request."""
+
+    def __init__(self) -> None:
+        """Initialize the API."""
+        self.health_checks = 0
+
+    async def add_points(
+        self, points: list[DawarichPoint], device_name: str
+    ) -> AddOnePointResponse:
+        """Fail to add the points."""
+        return AddOnePointResponse(response_code=503, error="Service Unavailable")
+
+    async def health(self) -> None:
+        """Fail the health check."""
+        self.health_checks += 1
+
+
+class RejectingDawarich:
+    """Dawarich API that rejects the first batch it gets as invalid."""
+
+    def __init__(self) -> None:
+        """Initialize the API."""
+        self.batches: list[list[DawarichPoint]] = []
+
+    async def add_points(
+        self, points: list[DawarichPoint], device_name: str
+    ) -> AddOnePointResponse:
+        """Reject the first batch and accept the others."""
+        self.batches.append(points)
+        if len(self.batches) == 1:
+            return AddOnePointResponse(response_code=422, error="Unprocessable Entity")
+        return AddOnePointResponse(response_code=200)
+
+
+def test_rejected_batch_does_not_block_the_next(tmp_path: Path) -> None:
+    """Test a batch Dawarich rejects is dropped and the next one is sent."""
+
+    async def run() -> tuple[list[list[DawarichPoint]], int, int, int]:
+        hass = HomeAssistant(str(tmp_path))
+        api = RejectingDawarich()
+        uploader = DawarichPointUploader(
+            hass, api, "phone", DawarichOutbox(hass, "test"), max_batch_size=1
+        )
+        start = dt_util.utcnow()
+        for second in range(2):
+            uploader.async_add_point(
+                DawarichPoint(
+                    latitude=59.3,
+                    longitude=18.0,
+                    timestamp=start + timedelta(seconds=second),
+                )
+            )
+        await uploader.async_flush()
+        await hass.async_stop(force=True)
+        telemetry = uploader.telemetry
+        return (
+            api.batches,
+            telemetry.points_dropped,
+            telemetry.points_sent,
+            uploader.queued_points,
+        )
+
+    batches, dropped, sent, queued = asyncio.run(run())
+
+    assert len(batches) == 2
+    assert batches[0] != batches[1]
+    assert (dropped, sent, queued) == (1, 1, 0)
+
+
+class SlowDawarich:
+    """Dawarich API that accepts points once it is released."""
+
+    def __init__(self) -> None:
+        """Initialize the API."""
+        self.release = asyncio.Event()
+        self.batches: list[int] = []
+
+    async def add_points(
+        self, points: list[DawarichPoint], device_name: str
+    ) -> AddOnePointResponse:
+        """Add the points after the API is released."""
+        await self.release.wait()
+        self.batches.append(len(points))
+        return AddOnePointResponse(response_code=200)
+
+
+def test_points_queued_during_a_flush_share_its_task(tmp_path: Path) -> None:
+    """Test points added while a batch is in flight do not start more flushes."""
+
+    async def run() -> tuple[int, list[int], int]:
+        hass = HomeAssistant(str(tmp_path))
+        api = SlowDawarich()
+        uploader = DawarichPointUploader(
+            hass, api, "phone", DawarichOutbox(hass, "test"), batch_size=1
+        )
+        start = dt_util.utcnow()
+        with patch.object(
+            hass,
+            "async_create_background_task",
+            wraps=hass.async_create_background_task,
+        ) as create_task:
+            for second in range(250):
+                uploader.async_add_point(
+                    DawarichPoint(
+                        latitude=59.3,
+                        longitude=18.0,
+                        timestamp=start + timedelta(seconds=second),
+                    )
+                )
+                await asyncio.sleep(0)
+            api.release.set()
+            await hass.async_block_till_done()
+        await hass.async_stop(force=True)
+        return create_task.call_count, api.batches, uploader.queued_points
+
+    flushes, batches, queued = asyncio.run(run())
+
+    assert flushes == 1
+    assert batches == [1, 249]
+    assert queued == 0
+
+
+def test_retry_delay_is_capped_after_many_failed_probes(tmp_path: Path) -> None:
+    """Test the retry delay stays capped however long Dawarich is down."""
+
+    async def run() -> tuple[int, int, list[timedelta]]:
+        hass = HomeAssistant(str(tmp_path))
+        api = UnavailableDawarich()
+        uploader = DawarichPointUploader(
+            hass, api, "phone", DawarichOutbox(hass, "test")
+        )
+        uploader.async_add_point(
+            DawarichPoint(latitude=59.3, longitude=18.0, timestamp=dt_util.utcnow())
+        )
+        with patch(
+            "custom_components.dawarich.uploader.async_call_later"
+        ) as call_later:
+            for _ in range(60):
+                await uploader.async_flush()
+        await hass.async_stop(force=True)
+        delays = [call.args[1] for call in call_later.call_args_list]
+        return uploader.consecutive_failures, api.health_checks, delays
+
+    failures, health_checks, delays = asyncio.run(run())
+
+    assert failures == 60
+    assert health_checks > 50
+    assert all(delay <= UPLOAD_RETRY_MAX_DELAY for delay in delays)
+    assert delays[-1] >= UPLOAD_RETRY_MAX_DELAY / 2